@@ -1,8 +1,8 @@
 import os
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from typing import Optional
 
-@dataclass
+@dataclass(frozen=True, slots=True)
 class BotConfig:
     """Production-grade configuration for real trading"""
     
@@ -10,6 +10,8 @@ class BotConfig:
     BINANCE_API_KEY: str = os.getenv('BINANCE_API_KEY', '')
     BINANCE_API_SECRET: str = os.getenv('BINANCE_API_SECRET', '')
     TESTNET: bool = False  # ⚠️ FALSE = REAL MONEY!
+    ACCOUNT_CACHE_TTL_SEC: float = 1.0  # Reuse account/position data fetched within this window
+    VOLUME_24H_CACHE_SEC: float = 60.0  # Reuse the 24h ticker volume fetched within this window
     
     # ============== TRADING PAIRS ==============
     SYMBOL: str = 'BTCUSDT'
@@ -18,12 +20,29 @@ class BotConfig:
     
     # ============== WEBSOCKET SETTINGS ==============
     ORDERBOOK_DEPTH: int = 20
+    ORDERBOOK_CAPACITY: int = 1000  # Initial price levels per side (grows as needed)
     TRADE_STREAM_BUFFER: int = 2000
-    KLINE_INTERVALS: list = None  # ['1m', '5m', '15m']
+    KLINE_BUFFER: int = 500  # Closed candles kept per interval
+    KLINE_INTERVALS: tuple = None  # ('1m', '5m', '15m')
     
     def __post_init__(self):
+        # Frozen dataclass: derived values must be set through object.__setattr__
+        set_ = object.__setattr__
+        
         if self.KLINE_INTERVALS is None:
-            self.KLINE_INTERVALS = ['1m', '5m', '15m']
+            set_(self, 'KLINE_INTERVALS', ('1m', '5m', '15m'))
+        else:
+            set_(self, 'KLINE_INTERVALS', tuple(self.KLINE_INTERVALS))
+        
+        # Precompute constants used on every analysis tick
+        set_(self, 'stop_loss_frac', self.STOP_LOSS_PERCENT * 0.01)
+        set_(self, 'tp_frac', self.TAKE_PROFIT_PERCENT * 0.01)
+        set_(self, 'trailing_stop_frac', self.TRAILING_STOP_PERCENT * 0.01)
+        set_(self, 'imbalance_lo', 1 - self.IMBALANCE_THRESHOLD)
+        set_(self, 'alpha_fast', 2 / (self.EMA_FAST + 1))
+        set_(self, 'alpha_medium', 2 / (self.EMA_MEDIUM + 1))
+        set_(self, 'alpha_slow', 2 / (self.EMA_SLOW + 1))
+        set_(self, 'alpha_trend', 2 / (self.EMA_TREND + 1))
     
     # ============== ORDER FLOW THRESHOLDS ==============
     SPOOF_MIN_SIZE_BTC: float = 50.0
@@ -63,6 +82,9 @@ class BotConfig:
     KELLY_RISK_REWARD: float = 2.0  # Average win/loss ratio
     KELLY_FRACTION: float = 0.25  # Use 25% of Kelly (safer)
     
+    # Integer fixed-point sizing (cents / 1e-6 BTC steps) - for large backtests, not live trading
+    FIXED_POINT_SIZING: bool = False
+    
     # Account Protection
     MAX_ACCOUNT_RISK_PERCENT: float = 5.0  # Never risk more than 5% total
     MAX_DAILY_LOSS_PERCENT: float = 3.0  # Stop trading if lose 3% in a day
@@ -95,10 +117,22 @@ class BotConfig:
     # ============== LOGGING & MONITORING ==============
     LOG_LEVEL: str = 'INFO'
     LOG_FILE: str = 'orderflow_bot_production.log'
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024  # Rotate the log file at 10 MB
+    LOG_BACKUP_COUNT: int = 5
     TELEGRAM_ALERTS: bool = False
     TELEGRAM_BOT_TOKEN: str = os.getenv('TELEGRAM_BOT_TOKEN', '')
     TELEGRAM_CHAT_ID: str = os.getenv('TELEGRAM_CHAT_ID', '')
     
     # ============== EMERGENCY CONTROLS ==============
     ENABLE_TRADING: bool = True  # Master switch
-    EMERGENCY_STOP: bool = False  # Set to True to immediately close all positions
\ No newline at end of file
+    EMERGENCY_STOP: bool = False  # Set to True to immediately close all positions
+    
+    # ============== DERIVED CONSTANTS (set in __post_init__) ==============
+    stop_loss_frac: float = field(init=False, repr=False)
+    tp_frac: float = field(init=False, repr=False)
+    trailing_stop_frac: float = field(init=False, repr=False)
+    imbalance_lo: float = field(init=False, repr=False)
+    alpha_fast: float = field(init=False, repr=False)
+    alpha_medium: float = field(init=False, repr=False)
+    alpha_slow: float = field(init=False, repr=False)
+    alpha_trend: float = field(init=False, repr=False)
\ No newline at end of file
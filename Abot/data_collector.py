@@ -1,12 +1,149 @@
+import aiohttp
 import asyncio
 import json
+import threading
+import time
 from binance import AsyncClient, BinanceSocketManager
 from binance.enums import *
 from collections import deque
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 import pandas as pd
 import numpy as np
 
+def _install_orjson_decoder():
+    """
+    Decode websocket frames and REST responses with orjson when it is installed
+    
+    Recent python-binance releases route decoding through
+    ReconnectingWebsocket.json_loads; older ones call json.loads directly
+    from _handle_message, so that method is replaced instead. REST bodies
+    are decoded straight from bytes in AsyncClient._handle_response.
+    """
+    try:
+        import orjson
+    except ImportError:
+        return
+    
+    from binance.exceptions import BinanceAPIException, BinanceRequestException
+    
+    async def _handle_response(self, response):
+        if not str(response.status).startswith('2'):
+            raise BinanceAPIException(response, response.status, await response.text())
+        
+        body = await response.read()
+        if not body:
+            return {}
+        
+        try:
+            return orjson.loads(body)
+        except ValueError:
+            raise BinanceRequestException(f'Invalid Response: {body.decode(errors="replace")}')
+    
+    AsyncClient._handle_response = _handle_response
+    
+    try:
+        from binance.ws.reconnecting_websocket import ReconnectingWebsocket
+    except ImportError:  # Older python-binance layout
+        from binance.streams import ReconnectingWebsocket
+    
+    if hasattr(ReconnectingWebsocket, 'json_loads'):
+        ReconnectingWebsocket.json_loads = lambda self, msg: orjson.loads(msg)
+        return
+    
+    def _handle_message(self, evt):
+        try:
+            return orjson.loads(evt)
+        except ValueError:
+            self._log.debug(f'error parsing evt json:{evt}')
+            return None
+    
+    ReconnectingWebsocket._handle_message = _handle_message
+
+_install_orjson_decoder()
+
+# Columns of EnhancedDataCollector.kline_arr
+OPEN, HIGH, LOW, CLOSE, VOLUME = 0, 1, 2, 3, 4
+
+def to_datetime(ts_ns: int) -> datetime:
+    """Convert an epoch-nanosecond timestamp to datetime (for logging/display only)"""
+    return datetime.fromtimestamp(ts_ns / 1e9)
+
+@dataclass
+class Footprint:
+    """Per-price-level traded volume over a window (parallel float64 arrays)"""
+    buy_volume: np.ndarray
+    sell_volume: np.ndarray
+    delta: np.ndarray
+    price_levels: np.ndarray
+    
+    def to_frame(self) -> pd.DataFrame:
+        """DataFrame view (indexed by price) for consumers of the pandas footprint API"""
+        return pd.DataFrame(
+            {'buy_volume': self.buy_volume, 'sell_volume': self.sell_volume, 'delta': self.delta},
+            index=pd.Index(self.price_levels, name='price')
+        )
+
+@dataclass(slots=True)
+class DepthUpdate:
+    """Book summary computed while applying a depth update (passed to orderbook callbacks)"""
+    version: int
+    timestamp: int  # epoch ns
+    best_bid: float  # 0.0 when the side is empty
+    best_ask: float
+    bid_size_sum: float
+    ask_size_sum: float
+
+@dataclass(slots=True, frozen=True)
+class AccountSnapshot:
+    """Consistent view of the account, swapped as a whole on every account update"""
+    balance: float
+    daily_pnl: float
+    open_positions_count: int
+
+class StreamWorker(threading.Thread):
+    """
+    Runs websocket streams on a private event loop in a daemon thread
+    
+    Each worker opens its own AsyncClient/BinanceSocketManager so a burst on
+    one stream never queues behind another. `streams` are coroutine functions
+    taking the worker's socket manager.
+    """
+    
+    def __init__(self, name: str, config: BotConfig, streams: list):
+        super().__init__(name=name, daemon=True)
+        self.config = config
+        self.streams = streams
+        self.loop = None
+        self._task = None
+    
+    def run(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        
+        try:
+            self._task = self.loop.create_task(self._run())
+            self.loop.run_until_complete(self._task)
+        except asyncio.CancelledError:
+            pass
+        finally:
+            self.loop.close()
+    
+    async def _run(self):
+        # Market data streams are public - no credentials needed
+        client = await AsyncClient.create(testnet=self.config.TESTNET)
+        
+        try:
+            bsm = BinanceSocketManager(client)
+            await asyncio.gather(*(stream(bsm) for stream in self.streams))
+        finally:
+            await client.close_connection()
+    
+    def stop(self):
+        """Cancel the streams from any thread (the worker closes its client)"""
+        if self._task is not None and not self.loop.is_closed():
+            self.loop.call_soon_threadsafe(self._task.cancel)
+
 class EnhancedDataCollector:
     """
     Enhanced data collector with:
@@ -14,6 +151,13 @@ class EnhancedDataCollector:
     - Trade stream (for footprint)
     - Kline data (for moving averages)
     - Account data (for position sizing)
+    
+    Callbacks: orderbook callbacks receive a DepthUpdate, trade callbacks
+    receive (collector, n_new_trades) and read the ring through get_trades()
+    / get_recent(), kline callbacks receive (interval, candle) with an
+    epoch-ns 'timestamp'. The trades / orderbook / klines properties rebuild
+    the old dict/deque shapes for consumers not yet ported to the arrays -
+    they copy on every access, so keep them off hot paths.
     """
     
     def __init__(self, config: BotConfig):
@@ -21,26 +165,65 @@ class EnhancedDataCollector:
         self.client = None
         self.bsm = None
         
-        # Order Flow Data
-        self.orderbook = {'bids': {}, 'asks': {}}
-        self.orderbook_history = deque(maxlen=200)
-        self.trades = deque(maxlen=config.TRADE_STREAM_BUFFER)
+        # Order Flow Data (SoA: parallel price/qty arrays, sorted by ascending price)
+        self.bid_px = np.empty(config.ORDERBOOK_CAPACITY, dtype=np.float64)
+        self.bid_qty = np.empty(config.ORDERBOOK_CAPACITY, dtype=np.float64)
+        self.ask_px = np.empty(config.ORDERBOOK_CAPACITY, dtype=np.float64)
+        self.ask_qty = np.empty(config.ORDERBOOK_CAPACITY, dtype=np.float64)
+        self.n_bids = 0
+        self.n_asks = 0
+        self._book_lock = threading.Lock()  # Book is rebuilt on the depth worker thread
+        self.orderbook_version = 0  # Bumped on every depth update
+        self.orderbook_updated = None
+        self.last_depth = None  # DepthUpdate from the most recent update
+        self.orderbook_history = deque(maxlen=200)  # (version, snapshot), filled on read
+        self._snapshot = None
+        self._snapshot_version = -1
+        
+        # Trade ring buffer (SoA). Every slot is written twice (i and i + N) so the
+        # last N trades are always one contiguous, chronologically ordered view.
+        n = config.TRADE_STREAM_BUFFER
+        self.trade_ts = np.zeros(2 * n, dtype=np.int64)  # exchange time, epoch ns
+        self.trade_px = np.zeros(2 * n, dtype=np.float64)
+        self.trade_qty = np.zeros(2 * n, dtype=np.float64)
+        self.trade_maker = np.zeros(2 * n, dtype=np.bool_)  # True = buyer is maker (taker sold)
+        self.trade_head = 0
+        self.trade_count = 0
+        self._trade_lock = threading.Lock()  # Ring is written on the trade worker thread
         
         # Price Action Data
-        self.klines = {interval: deque(maxlen=500) for interval in config.KLINE_INTERVALS}
+        # Closed candles of every interval in one mirrored ring laid out as
+        # (interval, column, slot), so each column of the last N candles is a
+        # contiguous view. Heads are published after the slots are written.
+        n, n_intervals = config.KLINE_BUFFER, len(config.KLINE_INTERVALS)
+        self.kline_index = {interval: i for i, interval in enumerate(config.KLINE_INTERVALS)}
+        self.kline_arr = np.zeros((n_intervals, 5, 2 * n), dtype=np.float64)
+        self.kline_ts = np.zeros((n_intervals, 2 * n), dtype=np.int64)  # open time, epoch ns
+        self.kline_head = [0] * n_intervals
+        self.kline_count = [0] * n_intervals
+        self.closes_epoch = {interval: 0 for interval in config.KLINE_INTERVALS}  # Candles appended so far
         self.current_price = 0.0
         
         # Account Data
         self.account_balance = 0.0
         self.open_positions = []
+        self.positions_soa = self._positions_to_soa([])  # open_positions, preparsed
         self.daily_pnl = 0.0
         self.daily_trades = 0
+        self.account = AccountSnapshot(balance=0.0, daily_pnl=0.0, open_positions_count=0)
+        self._acct_ts = 0.0  # time.monotonic() of the last completed refresh
+        self._acct_task = None  # In-flight refresh shared by concurrent callers
+        self._acct_pending = None  # Forced refresh queued behind _acct_task
         
-        # Callbacks
+        # Callbacks (always run on the main loop, whichever thread streams the data)
         self.orderbook_callbacks = []
         self.trade_callbacks = []
         self.kline_callbacks = []
         
+        # Stream threads
+        self.workers = []
+        self._main_loop = None
+        
     async def connect(self):
         """Connect to Binance API"""
         if not self.config.BINANCE_API_KEY or not self.config.BINANCE_API_SECRET:
@@ -49,10 +232,14 @@ class EnhancedDataCollector:
         # Create client
         base_url = None if not self.config.TESTNET else 'https://testnet.binancefuture.com'
         
+        # One pooled keep-alive session for every REST call (no per-request TLS handshake)
         self.client = await AsyncClient.create(
             api_key=self.config.BINANCE_API_KEY,
             api_secret=self.config.BINANCE_API_SECRET,
-            testnet=self.config.TESTNET
+            testnet=self.config.TESTNET,
+            session_params={
+                'connector': aiohttp.TCPConnector(limit=20, keepalive_timeout=75, ttl_dns_cache=300)
+            }
         )
         
         self.bsm = BinanceSocketManager(self.client)
@@ -63,8 +250,51 @@ class EnhancedDataCollector:
         # Fetch initial account data
         await self.update_account_info()
         
-    async def update_account_info(self):
-        """Get current account balance and positions"""
+    async def update_account_info(self, force: bool = False):
+        """
+        Get current account balance and positions
+        
+        Results younger than ACCOUNT_CACHE_TTL_SEC are reused and concurrent
+        callers share one in-flight refresh. Use force=True after placing
+        orders to bypass the cache: concurrent forced callers share a single
+        refresh queued behind the one in flight, so it sees their orders.
+        """
+        if force:
+            if self._acct_pending is None:
+                self._acct_pending = asyncio.ensure_future(self._queued_refresh())
+            await asyncio.shield(self._acct_pending)
+            return
+        
+        if self._acct_task is not None:
+            await asyncio.shield(self._acct_task)
+            return
+        
+        if time.monotonic() - self._acct_ts < self.config.ACCOUNT_CACHE_TTL_SEC:
+            return
+        
+        await asyncio.shield(self._start_refresh())
+    
+    async def _queued_refresh(self):
+        """Forced refresh: wait out the one in flight, then fetch anew"""
+        while self._acct_task is not None:
+            await asyncio.shield(self._acct_task)
+        
+        # Forced callers arriving from here on queue the next refresh
+        self._acct_pending = None
+        await self._start_refresh()
+    
+    def _start_refresh(self) -> asyncio.Future:
+        """Launch a REST refresh, published as the in-flight one until it finishes"""
+        task = self._acct_task = asyncio.ensure_future(self._refresh_account_info())
+        task.add_done_callback(self._clear_refresh)
+        return task
+    
+    def _clear_refresh(self, task: asyncio.Future):
+        if self._acct_task is task:
+            self._acct_task = None
+    
+    async def _refresh_account_info(self):
+        """Fetch balance and open positions from the REST API"""
         try:
             account = await self.client.futures_account()
             
@@ -76,101 +306,437 @@ class EnhancedDataCollector:
             
             # Get open positions
             positions = await self.client.futures_position_information(symbol=self.config.SYMBOL)
-            self.open_positions = [
-                p for p in positions 
-                if float(p['positionAmt']) != 0
-            ]
+            open_positions = []
+            
+            for p in positions:
+                amt = float(p['positionAmt'])
+                if amt != 0:
+                    # Numeric fields are parsed once here, not on every read
+                    p['_amt'] = amt
+                    p['_entry'] = float(p['entryPrice'])
+                    p['_pnl'] = float(p['unRealizedProfit'])
+                    open_positions.append(p)
+            
+            self.open_positions = open_positions
+            self.positions_soa = self._positions_to_soa(self.open_positions)
+            self.publish_account()
             
             print(f"💰 Account Balance: ${self.account_balance:.2f} USDT")
             print(f"📊 Open Positions: {len(self.open_positions)}")
             
+            self._acct_ts = time.monotonic()
+            
         except Exception as e:
             print(f"⚠️ Error fetching account info: {e}")
     
-    async def stream_orderbook(self):
+    def start_streams(self):
+        """
+        Start the order book, trade and kline streams, each on its own thread
+        
+        Must be called from the main event loop: callbacks are scheduled back
+        onto it.
+        """
+        self._main_loop = asyncio.get_running_loop()
+        
+        self.workers = [
+            StreamWorker('depth-stream', self.config, [self.stream_orderbook]),
+            StreamWorker('trade-stream', self.config, [self.stream_trades]),
+            StreamWorker('kline-stream', self.config, [
+                lambda bsm, interval=interval: self.stream_klines(interval, bsm)
+                for interval in self.config.KLINE_INTERVALS
+            ])
+        ]
+        
+        for worker in self.workers:
+            worker.start()
+    
+    def stop_streams(self):
+        """Cancel all stream threads"""
+        for worker in self.workers:
+            worker.stop()
+    
+    async def _dispatch(self, callbacks: list, *args):
+        """Run callbacks on the main loop (inline when already on it)"""
+        loop = self._main_loop
+        
+        if loop is None or loop is asyncio.get_running_loop():
+            for callback in callbacks:
+                await callback(*args)
+            return
+        
+        for callback in callbacks:
+            future = asyncio.run_coroutine_threadsafe(callback(*args), loop)
+            future.add_done_callback(self._report_callback_error)
+    
+    @staticmethod
+    def _report_callback_error(future):
+        """Surface exceptions from callbacks scheduled onto the main loop"""
+        if future.cancelled():
+            return
+        
+        error = future.exception()
+        if error is not None:
+            print(f"⚠️ Stream callback failed: {error!r}")
+    
+    def publish_account(self):
+        """Swap in a new AccountSnapshot after balance, PnL or positions changed"""
+        self.account = AccountSnapshot(
+            balance=self.account_balance,
+            daily_pnl=self.daily_pnl,
+            open_positions_count=len(self.open_positions)
+        )
+    
+    @staticmethod
+    def _positions_to_soa(positions: list) -> dict:
+        """
+        Gather preparsed position fields into parallel arrays
+        
+        Returns: {
+            'position_id': list,  # symbol + '_' + positionSide
+            'position_amt': np.ndarray,  # signed, > 0 = long
+            'entry_price': np.ndarray,
+            'unrealized_pnl': np.ndarray
+        }
+        """
+        return {
+            'position_id': [p['symbol'] + '_' + p['positionSide'] for p in positions],
+            'position_amt': np.array([p['_amt'] for p in positions], dtype=np.float64),
+            'entry_price': np.array([p['_entry'] for p in positions], dtype=np.float64),
+            'unrealized_pnl': np.array([p['_pnl'] for p in positions], dtype=np.float64)
+        }
+    
+    async def stream_orderbook(self, bsm=None):
         """Stream order book updates"""
-        socket = self.bsm.depth_socket(self.config.SYMBOL)
+        socket = (bsm or self.bsm).depth_socket(self.config.SYMBOL)
         
         async with socket as stream:
             while True:
-                msg = await stream.recv()
-                timestamp = datetime.now()
-                
-                # Update order book
-                for bid in msg['b']:
-                    price, qty = float(bid[0]), float(bid[1])
-                    if qty == 0:
-                        self.orderbook['bids'].pop(price, None)
-                    else:
-                        self.orderbook['bids'][price] = qty
-                
-                for ask in msg['a']:
-                    price, qty = float(ask[0]), float(ask[1])
-                    if qty == 0:
-                        self.orderbook['asks'].pop(price, None)
-                    else:
-                        self.orderbook['asks'][price] = qty
+                # Take everything already queued and apply it as one update
+                batch = await self._drain(stream, await stream.recv())
                 
-                snapshot = {
-                    'timestamp': timestamp,
-                    'bids': dict(self.orderbook['bids']),
-                    'asks': dict(self.orderbook['asks'])
-                }
-                self.orderbook_history.append(snapshot)
+                with self._book_lock:
+                    update = self._apply_update(batch)
                 
-                for callback in self.orderbook_callbacks:
-                    await callback(snapshot)
+                if self.orderbook_callbacks:
+                    await self._dispatch(self.orderbook_callbacks, update)
+    
+    def _apply_update(self, batch: list) -> DepthUpdate:
+        """
+        Apply a batch of depth messages to the book and summarize the result
+        
+        Top of book and per-side resting size are computed here, while the
+        arrays are hot, so consumers never need to rescan the book.
+        """
+        bids = np.array([level for msg in batch for level in msg['b']], dtype=np.float64).reshape(-1, 2)
+        asks = np.array([level for msg in batch for level in msg['a']], dtype=np.float64).reshape(-1, 2)
+        
+        self.bid_px, self.bid_qty, self.n_bids = self._apply_levels(
+            self.bid_px, self.bid_qty, self.n_bids, bids
+        )
+        self.ask_px, self.ask_qty, self.n_asks = self._apply_levels(
+            self.ask_px, self.ask_qty, self.n_asks, asks
+        )
+        
+        # No copy here: snapshots are materialized lazily by readers
+        self.orderbook_version += 1
+        self.orderbook_updated = time.time_ns()
+        
+        self.last_depth = DepthUpdate(
+            version=self.orderbook_version,
+            timestamp=self.orderbook_updated,
+            best_bid=self.bid_px[self.n_bids - 1] if self.n_bids else 0.0,
+            best_ask=self.ask_px[0] if self.n_asks else 0.0,
+            bid_size_sum=self.bid_qty[:self.n_bids].sum(),
+            ask_size_sum=self.ask_qty[:self.n_asks].sum()
+        )
+        return self.last_depth
+    
+    @staticmethod
+    async def _drain(stream, first: dict) -> list:
+        """Return `first` plus any messages the socket can hand over without waiting"""
+        batch = [first]
+        
+        # A zero deadline still lets recv() return a message that is already
+        # queued (wait_for(timeout=0) would give up before recv() even starts)
+        while True:
+            try:
+                async with asyncio.timeout(0):
+                    batch.append(await stream.recv())
+            except TimeoutError:
+                return batch
+    
+    @staticmethod
+    def _apply_levels(px: np.ndarray, qty: np.ndarray, n: int,
+                      levels: np.ndarray) -> tuple[np.ndarray, np.ndarray, int]:
+        """
+        Apply a batch of (price, qty) updates to a sorted book side in one pass
+        
+        qty == 0 removes a level. When a price appears more than once in the
+        batch, the last update wins.
+        
+        Returns: (px, qty, n) - arrays are reallocated only when capacity is exceeded
+        """
+        if len(levels) == 0:
+            return px, qty, n
+        
+        # Keep the last update per price (np.unique on the reversed batch)
+        prices, last = np.unique(levels[::-1, 0], return_index=True)
+        sizes = levels[::-1, 1][last]
+        
+        book_px, book_qty = px[:n], qty[:n]
+        idx = np.searchsorted(book_px, prices)
+        found = idx < n
+        found[found] = book_px[idx[found]] == prices[found]
+        
+        # Existing levels are overwritten in place
+        book_qty[idx[found]] = sizes[found]
+        
+        insert = ~found & (sizes != 0)
+        if not insert.any() and (sizes[found] != 0).all():
+            return px, qty, n
+        
+        # New levels and removals change the layout: rebuild the live prefix
+        book_px = np.insert(book_px, idx[insert], prices[insert])
+        book_qty = np.insert(book_qty, idx[insert], sizes[insert])
+        keep = book_qty != 0
+        book_px, book_qty = book_px[keep], book_qty[keep]
+        
+        n = len(book_px)
+        if n > len(px):
+            px = np.empty(2 * n, dtype=np.float64)
+            qty = np.empty(2 * n, dtype=np.float64)
+        
+        px[:n] = book_px
+        qty[:n] = book_qty
+        return px, qty, n
+    
+    def get_orderbook_snapshot(self) -> dict:
+        """
+        Copy of the current book as contiguous float64 buffers
+        
+        The copy is made at most once per book version and recorded in
+        orderbook_history, so repeated reads between updates are free.
+        
+        Returns: {
+            'version': int,
+            'timestamp': int,  # epoch ns of the last depth update
+            'bids': (prices, quantities),  # ascending price, best bid last
+            'asks': (prices, quantities)   # ascending price, best ask first
+        }
+        """
+        with self._book_lock:
+            return self._take_snapshot()
+    
+    def _take_snapshot(self) -> dict:
+        if self._snapshot_version != self.orderbook_version:
+            self._snapshot = {
+                'version': self.orderbook_version,
+                'timestamp': self.orderbook_updated,
+                'bids': (self.bid_px[:self.n_bids].copy(), self.bid_qty[:self.n_bids].copy()),
+                'asks': (self.ask_px[:self.n_asks].copy(), self.ask_qty[:self.n_asks].copy())
+            }
+            self._snapshot_version = self.orderbook_version
+            self.orderbook_history.append((self.orderbook_version, self._snapshot))
+        
+        return self._snapshot
+    
+    def get_liquidity_walls(self) -> dict:
+        """
+        Find resting orders of at least WALL_MIN_SIZE_BTC within
+        WALL_DISTANCE_PERCENT of the mid price (vectorized over the book)
+        
+        Returns: {'bids': (prices, quantities), 'asks': (prices, quantities)}
+        """
+        with self._book_lock:
+            return self._find_walls()
     
-    async def stream_trades(self):
+    def _find_walls(self) -> dict:
+        bid_px, bid_qty = self.bid_px[:self.n_bids], self.bid_qty[:self.n_bids]
+        ask_px, ask_qty = self.ask_px[:self.n_asks], self.ask_qty[:self.n_asks]
+        
+        if self.n_bids == 0 or self.n_asks == 0:
+            return {'bids': (bid_px[:0], bid_qty[:0]), 'asks': (ask_px[:0], ask_qty[:0])}
+        
+        mid = (self.last_depth.best_bid + self.last_depth.best_ask) / 2
+        max_distance = mid * self.config.WALL_DISTANCE_PERCENT / 100
+        min_size = self.config.WALL_MIN_SIZE_BTC
+        
+        bid_mask = (bid_qty >= min_size) & (bid_px >= mid - max_distance)
+        ask_mask = (ask_qty >= min_size) & (ask_px <= mid + max_distance)
+        
+        return {
+            'bids': (bid_px[bid_mask], bid_qty[bid_mask]),
+            'asks': (ask_px[ask_mask], ask_qty[ask_mask])
+        }
+    
+    async def stream_trades(self, bsm=None):
         """Stream executed trades"""
-        socket = self.bsm.trade_socket(self.config.SYMBOL)
+        socket = (bsm or self.bsm).trade_socket(self.config.SYMBOL)
         
         async with socket as stream:
             while True:
-                msg = await stream.recv()
-                
-                trade = {
-                    'timestamp': datetime.fromtimestamp(msg['T'] / 1000),
-                    'price': float(msg['p']),
-                    'quantity': float(msg['q']),
-                    'is_buyer_maker': msg['m'],
-                    'trade_id': msg['t']
-                }
+                batch = await self._drain(stream, await stream.recv())
                 
-                self.trades.append(trade)
-                self.current_price = trade['price']
+                self._append_trades(
+                    np.array([msg['T'] for msg in batch], dtype=np.int64) * 1_000_000,
+                    np.array([msg['p'] for msg in batch], dtype=np.float64),
+                    np.array([msg['q'] for msg in batch], dtype=np.float64),
+                    np.array([msg['m'] for msg in batch], dtype=np.bool_)
+                )
                 
-                for callback in self.trade_callbacks:
-                    await callback(trade)
+                if self.trade_callbacks:
+                    await self._dispatch(self.trade_callbacks, self, len(batch))
+    
+    def _append_trades(self, ts: np.ndarray, px: np.ndarray, qty: np.ndarray, maker: np.ndarray):
+        """Bulk-write trades (oldest first) into the mirrored ring buffer"""
+        n = self.config.TRADE_STREAM_BUFFER
+        ts, px, qty, maker = ts[-n:], px[-n:], qty[-n:], maker[-n:]
+        
+        with self._trade_lock:
+            slots = (self.trade_head + np.arange(len(ts))) % n
+            for offset in (0, n):
+                self.trade_ts[slots + offset] = ts
+                self.trade_px[slots + offset] = px
+                self.trade_qty[slots + offset] = qty
+                self.trade_maker[slots + offset] = maker
+            
+            self.trade_head = (self.trade_head + len(ts)) % n
+            self.trade_count = min(self.trade_count + len(ts), n)
+        
+        self.current_price = px[-1]
+    
+    def get_trades(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Copies of all buffered trades, oldest first
+        
+        Returns: (timestamps_ns, prices, quantities, is_buyer_maker)
+        """
+        with self._trade_lock:
+            end = self.trade_head + self.config.TRADE_STREAM_BUFFER
+            return self._copy_trades(end - self.trade_count, end)
+    
+    def _copy_trades(self, start: int, end: int) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # Caller holds _trade_lock: the worker thread rewrites slots inside the window
+        return (self.trade_ts[start:end].copy(), self.trade_px[start:end].copy(),
+                self.trade_qty[start:end].copy(), self.trade_maker[start:end].copy())
+    
+    def build_footprint(self, timeframe_seconds: int = 60) -> Footprint:
+        """Aggregate taker buy/sell volume per traded price over the last timeframe"""
+        _, px, qty, is_buyer_maker = self.get_recent(timeframe_seconds)
+        
+        price_levels, level_idx = np.unique(px, return_inverse=True)
+        sell_qty = np.where(is_buyer_maker, qty, 0.0)
+        
+        sell_volume = np.bincount(level_idx, weights=sell_qty, minlength=len(price_levels))
+        buy_volume = np.bincount(level_idx, weights=qty - sell_qty, minlength=len(price_levels))
+        
+        return Footprint(
+            buy_volume=buy_volume,
+            sell_volume=sell_volume,
+            delta=buy_volume - sell_volume,
+            price_levels=price_levels
+        )
     
-    async def stream_klines(self, interval: str):
+    def get_recent(self, seconds: float) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Copies of the trades from the last `seconds`, oldest first"""
+        cutoff = time.time_ns() - int(seconds * 1_000_000_000)
+        
+        with self._trade_lock:
+            end = self.trade_head + self.config.TRADE_STREAM_BUFFER
+            start = end - self.trade_count
+            start += np.searchsorted(self.trade_ts[start:end], cutoff, side='right')
+            return self._copy_trades(start, end)
+    
+    async def stream_klines(self, interval: str, bsm=None):
         """Stream candlestick data for moving averages"""
-        socket = self.bsm.kline_socket(self.config.SYMBOL, interval=interval)
+        socket = (bsm or self.bsm).kline_socket(self.config.SYMBOL, interval=interval)
         
         async with socket as stream:
             while True:
                 msg = await stream.recv()
                 kline = msg['k']
                 
+                # Only closed candles are kept - skip parsing the in-progress ones
+                if not kline['x']:
+                    continue
+                
                 candle = {
-                    'timestamp': datetime.fromtimestamp(kline['t'] / 1000),
+                    'timestamp': kline['t'] * 1_000_000,  # epoch ns
                     'open': float(kline['o']),
                     'high': float(kline['h']),
                     'low': float(kline['l']),
                     'close': float(kline['c']),
                     'volume': float(kline['v']),
-                    'is_closed': kline['x']
+                    'is_closed': True
                 }
+                self._append_kline(interval, candle)
                 
-                if candle['is_closed']:
-                    self.klines[interval].append(candle)
-                    
-                    for callback in self.kline_callbacks:
-                        await callback(interval, candle)
+                if self.kline_callbacks:
+                    await self._dispatch(self.kline_callbacks, interval, candle)
+    
+    def _append_kline(self, interval: str, candle: dict):
+        """Write a closed candle into the interval's mirrored ring"""
+        idx = self.kline_index[interval]
+        n = self.config.KLINE_BUFFER
+        head = self.kline_head[idx]
+        row = (candle['open'], candle['high'], candle['low'], candle['close'], candle['volume'])
+        
+        for slot in (head, head + n):
+            self.kline_arr[idx, :, slot] = row
+            self.kline_ts[idx, slot] = candle['timestamp']
+        
+        self.kline_head[idx] = (head + 1) % n
+        self.kline_count[idx] = min(self.kline_count[idx] + 1, n)
+        self.closes_epoch[interval] += 1
+    
+    def get_klines(self, interval: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Views over all buffered closed candles of an interval, oldest first
+        
+        Returns: (timestamps_ns, ohlcv) - ohlcv has shape (5, count), rows
+        indexed by OPEN, HIGH, LOW, CLOSE, VOLUME
+        """
+        idx = self.kline_index[interval]
+        end = self.kline_head[idx] + self.config.KLINE_BUFFER
+        start = end - self.kline_count[idx]
+        return self.kline_ts[idx, start:end], self.kline_arr[idx, :, start:end]
     
     def get_closes(self, interval: str, periods: int) -> np.array:
-        """Get closing prices for MA calculation"""
-        if interval not in self.klines or len(self.klines[interval]) < periods:
+        """Get closing prices for MA calculation (contiguous view, oldest first)"""
+        idx = self.kline_index.get(interval)
+        if idx is None or self.kline_count[idx] < periods:
             return np.array([])
         
-        return np.array([k['close'] for k in list(self.klines[interval])[-periods:]])
\ No newline at end of file
+        end = self.kline_head[idx] + self.config.KLINE_BUFFER
+        return self.kline_arr[idx, CLOSE, end - periods:end]
+    
+    @property
+    def trades(self) -> deque:
+        """Buffered trades as dicts, oldest first (compatibility view, built per access)"""
+        ts, px, qty, maker = self.get_trades()
+        return deque(
+            ({'timestamp': to_datetime(t), 'price': p, 'quantity': q, 'is_buyer_maker': m}
+             for t, p, q, m in zip(ts.tolist(), px.tolist(), qty.tolist(), maker.tolist())),
+            maxlen=self.config.TRADE_STREAM_BUFFER
+        )
+    
+    @property
+    def orderbook(self) -> dict:
+        """Current book as {'bids': {price: qty}, 'asks': {price: qty}} (compatibility view, built per access)"""
+        snapshot = self.get_orderbook_snapshot()
+        return {side: dict(zip(px.tolist(), qty.tolist()))
+                for side, (px, qty) in (('bids', snapshot['bids']), ('asks', snapshot['asks']))}
+    
+    @property
+    def klines(self) -> dict:
+        """Closed candles per interval as dicts, oldest first (compatibility view, built per access)"""
+        klines = {}
+        for interval in self.config.KLINE_INTERVALS:
+            ts, ohlcv = self.get_klines(interval)
+            klines[interval] = deque(
+                ({'timestamp': to_datetime(t), 'open': o, 'high': h, 'low': l,
+                  'close': c, 'volume': v, 'is_closed': True}
+                 for t, o, h, l, c, v in zip(ts.tolist(), *ohlcv.tolist())),
+                maxlen=self.config.KLINE_BUFFER
+            )
+        return klines
\ No newline at end of file
@@ -1,3 +1,33 @@
+import time
+
+from utils._njit import njit
+
+
+@njit(cache=True, fastmath=True)
+def _divergence(prices, deltas, threshold):
+    """
+    Compare price and delta trends over a window
+    
+    Returns: (type_code, strength, price_change, delta_change)
+    type_code: 1 = bullish, -1 = bearish, 0 = none
+    """
+    price_change = (prices[-1] - prices[0]) / prices[0]
+    delta_change = (deltas[-1] - deltas[0]) / (abs(deltas[0]) + 1)  # Avoid div by zero
+    
+    divergence_strength = abs(price_change - delta_change)
+    strength = min(100, int(divergence_strength * 200))
+    
+    # Bullish Divergence: Price falling, Delta rising
+    if price_change < -0.01 and delta_change > 0.01 and divergence_strength > threshold:
+        return 1, strength, price_change, delta_change
+    
+    # Bearish Divergence: Price rising, Delta falling
+    if price_change > 0.01 and delta_change < -0.01 and divergence_strength > threshold:
+        return -1, strength, price_change, delta_change
+    
+    return 0, 0, price_change, delta_change
+
+
 class DeltaDivergenceDetector:
     """
     Detects divergences between price and cumulative delta:
@@ -9,26 +39,36 @@ class DeltaDivergenceDetector:
         self.config = config
         self.footprint = footprint_analyzer
         
-        # Historical deltas
-        self.delta_history = deque(maxlen=100)
+        # Historical deltas (ring buffer, each slot mirrored at i + size so the
+        # most recent entries are always one contiguous view)
+        self.history_size = 100
+        self.history_ts = np.zeros(2 * self.history_size, dtype=np.int64)  # epoch ns
+        self.history_delta = np.zeros(2 * self.history_size, dtype=np.float64)
+        self.history_price = np.zeros(2 * self.history_size, dtype=np.float64)
+        self.history_head = 0
+        self.history_count = 0
         
     def calculate_cumulative_delta(self, timeframe_minutes: int = 5) -> float:
         """
         Calculate cumulative delta (buy volume - sell volume)
         """
-        footprint_df = self.footprint.build_footprint(timeframe_seconds=timeframe_minutes * 60)
+        fp = self.footprint.data_collector.build_footprint(timeframe_seconds=timeframe_minutes * 60)
         
-        if footprint_df.empty:
+        if fp.delta.size == 0:
             return 0.0
         
-        cumulative_delta = footprint_df['delta'].sum()
+        cumulative_delta = fp.delta.sum()
         
         # Store for history
-        self.delta_history.append({
-            'timestamp': datetime.now(),
-            'delta': cumulative_delta,
-            'price': self.footprint.data_collector.current_price
-        })
+        now_ns = time.time_ns()
+        slot = self.history_head
+        for i in (slot, slot + self.history_size):
+            self.history_ts[i] = now_ns
+            self.history_delta[i] = cumulative_delta
+            self.history_price[i] = self.footprint.data_collector.current_price
+        
+        self.history_head = (slot + 1) % self.history_size
+        self.history_count = min(self.history_count + 1, self.history_size)
         
         return cumulative_delta
     
@@ -39,39 +79,36 @@ class DeltaDivergenceDetector:
         Returns: {
             'type': 'bullish', 'bearish', or 'none',
             'strength': 0-100,
-            'description': str
+            'description_fmt': str,  # str.format template, rendered by the caller
+            'description_args': tuple
         }
         """
-        if len(self.delta_history) < self.config.DELTA_DIVERGENCE_PERIODS:
-            return {'type': 'none', 'strength': 0}
+        periods = self.config.DELTA_DIVERGENCE_PERIODS
         
-        recent_data = list(self.delta_history)[-self.config.DELTA_DIVERGENCE_PERIODS:]
-        
-        # Calculate price trend
-        prices = [d['price'] for d in recent_data]
-        price_change = (prices[-1] - prices[0]) / prices[0]
-        
-        # Calculate delta trend
-        deltas = [d['delta'] for d in recent_data]
-        delta_change = (deltas[-1] - deltas[0]) / (abs(deltas[0]) + 1)  # Avoid div by zero
+        if self.history_count < periods:
+            return {'type': 'none', 'strength': 0}
         
-        # Detect divergence
-        divergence_strength = abs(price_change - delta_change)
+        end = self.history_head + self.history_size
+        type_code, strength, price_change, delta_change = _divergence(
+            self.history_price[end - periods:end],
+            self.history_delta[end - periods:end],
+            self.config.DELTA_DIVERGENCE_THRESHOLD
+        )
         
-        # Bullish Divergence: Price falling, Delta rising
-        if price_change < -0.01 and delta_change > 0.01 and divergence_strength > self.config.DELTA_DIVERGENCE_THRESHOLD:
+        if type_code == 1:
             return {
                 'type': 'bullish',
-                'strength': min(100, int(divergence_strength * 200)),
-                'description': f'Bullish divergence: Price down {price_change:.1%}, Delta up {delta_change:.1%}'
+                'strength': strength,
+                'description_fmt': 'Bullish divergence: Price down {:.1%}, Delta up {:.1%}',
+                'description_args': (price_change, delta_change)
             }
         
-        # Bearish Divergence: Price rising, Delta falling
-        if price_change > 0.01 and delta_change < -0.01 and divergence_strength > self.config.DELTA_DIVERGENCE_THRESHOLD:
+        if type_code == -1:
             return {
                 'type': 'bearish',
-                'strength': min(100, int(divergence_strength * 200)),
-                'description': f'Bearish divergence: Price up {price_change:.1%}, Delta down {delta_change:.1%}'
+                'strength': strength,
+                'description_fmt': 'Bearish divergence: Price up {:.1%}, Delta down {:.1%}',
+                'description_args': (price_change, delta_change)
             }
         
-        return {'type': 'none', 'strength': 0}
\ No newline at end of file
+        return {'type': 'none', 'strength': 0}
@@ -1,3 +1,77 @@
+import time
+from dataclasses import dataclass, field, replace
+
+from utils._njit import njit
+
+# Score slots used to resolve bias with a single argmax
+BULL, BEAR = 0, 1
+BIAS_NAMES = ('bullish', 'bearish', 'neutral')
+DIRECTION_INDEX = {'bullish': BULL, 'bearish': BEAR}
+
+# Most strength a component can contribute to one direction (for early exit)
+MAX_SR_STRENGTH = 15  # Price at a major support or resistance node
+MAX_ABSORPTION_STRENGTH = 30  # Per absorbed liquidity wall
+MAX_FLOW_STRENGTH = 40  # Institutional activity (20) + volume imbalance (20)
+
+@dataclass(slots=True)
+class Signal:
+    """
+    Result of one analysis tick
+    
+    The strategy reuses a single scratch instance between ticks and only
+    publishes copies of it.
+    """
+    timestamp: int = 0  # epoch ns
+    bias: str = 'neutral'  # 'bullish', 'bearish', 'neutral'
+    strength: int = 0
+    action: str = 'wait'  # 'buy', 'sell', 'wait'
+    entry_price: float = 0.0
+    stop_loss: float = 0.0
+    take_profit: float = 0.0
+    reasons: list = field(default_factory=list)
+    components: dict = field(default_factory=dict)
+    
+    def reset(self, timestamp: int):
+        """Clear the previous tick's result in place"""
+        self.timestamp = timestamp
+        self.bias = 'neutral'
+        self.strength = 0
+        self.action = 'wait'
+        self.entry_price = 0.0
+        self.stop_loss = 0.0
+        self.take_profit = 0.0
+        self.reasons.clear()
+        self.components.clear()
+
+# Slots of the EMA state arrays
+FAST, MEDIUM, SLOW, TREND = 0, 1, 2, 3
+EMA_WINDOW = 200  # 5m closes the EMAs are computed from
+
+def _make_ema_updater(periods: tuple, alphas: tuple):
+    """
+    Build an EMA kernel with the four periods and smoothing factors baked in
+    
+    The returned function fills `state` (fast, medium, slow, trend) from the
+    trailing closes, each EMA over its own last `period` closes seeded with
+    the first of them, and `prev` (fast, medium) with the same EMAs one close
+    earlier for crossover detection.
+    """
+    p_fast, p_medium, p_slow, p_trend = periods
+    a_fast, a_medium, a_slow, a_trend = alphas
+    
+    @njit
+    def update(closes, state, prev):
+        n = len(closes)
+        state[FAST] = _ema_window(closes, n - p_fast, n, a_fast)
+        state[MEDIUM] = _ema_window(closes, n - p_medium, n, a_medium)
+        state[SLOW] = _ema_window(closes, n - p_slow, n, a_slow)
+        state[TREND] = _ema_window(closes, n - p_trend, n, a_trend)
+        
+        prev[FAST] = _ema_window(closes, n - 1 - p_fast, n - 1, a_fast)
+        prev[MEDIUM] = _ema_window(closes, n - 1 - p_medium, n - 1, a_medium)
+    
+    return update
+
 class EnhancedOrderFlowStrategy:
     """
     Complete trading strategy combining:
@@ -25,109 +99,160 @@ class EnhancedOrderFlowStrategy:
         self.market_conditions = market_conditions
         
         self.last_signal = None
+        self._signal_scratch = Signal()  # Reused by every analyze_market call
+        
+        # EMA state, recomputed once per closed 5m candle (not on every tick)
+        self._update_emas = _make_ema_updater(
+            (config.EMA_FAST, config.EMA_MEDIUM, config.EMA_SLOW, config.EMA_TREND),
+            (config.alpha_fast, config.alpha_medium, config.alpha_slow, config.alpha_trend)
+        )
+        self._ema_state = np.zeros(4, dtype=np.float64)
+        self._ema_prev = np.zeros(4, dtype=np.float64)
+        self._ema_ready = False
+        self._last_close = 0.0
+        
+        self.footprint.data_collector.kline_callbacks.append(self._on_kline)
+        
+    async def _on_kline(self, interval: str, candle: dict):
+        """Recompute the EMA state from the latest 5m closes when a candle closes"""
+        if interval != '5m':
+            return
         
-    async def analyze_market(self) -> dict:
+        closes = self.footprint.data_collector.get_closes('5m', EMA_WINDOW)
+        self._last_close = candle['close']
+        
+        if len(closes) < EMA_WINDOW:
+            return
+        
+        # Each EMA runs over its own trailing window seeded with the window's
+        # first close, so crossovers fire exactly where a from-scratch
+        # calculation would put them
+        self._update_emas(closes, self._ema_state, self._ema_prev)
+        
+        self._ema_ready = True
+    
+    async def analyze_market(self) -> Signal:
         """
         Complete multi-timeframe, multi-indicator analysis
         """
-        signal = {
-            'timestamp': datetime.now(),
-            'bias': 'neutral',
-            'strength': 0,
-            'reasons': [],
-            'action': 'wait',
-            'entry_price': 0,
-            'stop_loss': 0,
-            'take_profit': 0,
-            'components': {}
-        }
+        cfg = self.config
+        min_strength = cfg.MIN_SIGNAL_STRENGTH
+        sl_frac = cfg.stop_loss_frac
+        tp_frac = cfg.tp_frac
+        vp_hours = cfg.VP_LOOKBACK_HOURS
+        
+        signal = self._signal_scratch
+        signal.reset(time.time_ns())
         
         # STEP 1: CHECK MARKET CONDITIONS
         conditions = await self.market_conditions.analyze_conditions()
-        signal['components']['market_conditions'] = conditions
+        signal.components['market_conditions'] = conditions
         
         if not conditions['is_tradeable']:
-            signal['reasons'].append(f"⚠️ Market not tradeable: {', '.join(conditions['warnings'])}")
+            signal.reasons.append(f"⚠️ Market not tradeable: {', '.join(conditions['warnings'])}")
             return signal
         
+        # Each component adds its strength to the score of the direction it
+        # supports. Reasons are kept as (format, args) and only rendered if a
+        # signal actually forms. Cheap components run first so the expensive
+        # ones can be skipped once the threshold is out of reach.
+        scores = np.zeros(2, dtype=np.int32)
+        notes = []
+        current_price = self.footprint.data_collector.current_price
+        
         # STEP 2: MOVING AVERAGE ANALYSIS
         ma_signal = self._analyze_moving_averages()
-        signal['components']['moving_averages'] = ma_signal
+        signal.components['moving_averages'] = ma_signal
         
         if ma_signal['signal'] != 'none':
-            signal['strength'] += ma_signal['strength']
-            signal['reasons'].append(ma_signal['description'])
-            if signal['bias'] == 'neutral':
-                signal['bias'] = ma_signal['signal']
+            scores[DIRECTION_INDEX[ma_signal['signal']]] += ma_signal['strength']
+            notes.append((ma_signal['description_fmt'], *ma_signal['description_args']))
         
-        # STEP 3: VOLUME PROFILE ANALYSIS
-        vp_data = self.volume_profile.build_profile(lookback_hours=self.config.VP_LOOKBACK_HOURS)
-        signal['components']['volume_profile'] = vp_data
+        # STEP 3: DELTA DIVERGENCE
+        divergence = self.delta_divergence.detect_divergence()
+        signal.components['delta_divergence'] = divergence
         
-        current_price = self.footprint.data_collector.current_price
+        if divergence['type'] != 'none':
+            scores[DIRECTION_INDEX[divergence['type']]] += divergence['strength'] // 2  # Weight it less
+            notes.append(('📈 ' + divergence['description_fmt'], *divergence['description_args']))
+        
+        # Upper bound of what order flow can still add: every wall may show
+        # absorption, plus institutional activity and volume imbalance
+        wall_levels = self.heat_map.data_collector.get_liquidity_walls()
+        n_walls = len(wall_levels['bids'][0]) + len(wall_levels['asks'][0])
+        max_orderflow = MAX_ABSORPTION_STRENGTH * n_walls + MAX_FLOW_STRENGTH
+        
+        if scores.max() + MAX_SR_STRENGTH + max_orderflow < min_strength:
+            return self._reject(signal, scores)
+        
+        # STEP 4: VOLUME PROFILE ANALYSIS
+        vp_data = self.volume_profile.build_profile(lookback_hours=vp_hours)
+        signal.components['volume_profile'] = vp_data
         
         # Check if price is at key volume levels
         sr_levels = self.volume_profile.get_support_resistance()
         
         # Price at support = potential bounce
-        if sr_levels['support'] and abs(current_price - sr_levels['support'][0]) / current_price < 0.005:
-            signal['strength'] += 15
-            signal['reasons'].append(f"📊 Price at major support: ${sr_levels['support'][0]:.2f}")
-            if signal['bias'] == 'neutral':
-                signal['bias'] = 'bullish'
+        if len(sr_levels['support']) and abs(current_price - sr_levels['support'][0]) / current_price < 0.005:
+            scores[BULL] += MAX_SR_STRENGTH
+            notes.append(('📊 Price at major support: ${:.2f}', sr_levels['support'][0]))
         
         # Price at resistance = potential rejection
-        if sr_levels['resistance'] and abs(current_price - sr_levels['resistance'][0]) / current_price < 0.005:
-            signal['strength'] += 15
-            signal['reasons'].append(f"📊 Price at major resistance: ${sr_levels['resistance'][0]:.2f}")
-            if signal['bias'] == 'neutral':
-                signal['bias'] = 'bearish'
-        
-        # STEP 4: DELTA DIVERGENCE
-        divergence = self.delta_divergence.detect_divergence()
-        signal['components']['delta_divergence'] = divergence
+        if len(sr_levels['resistance']) and abs(current_price - sr_levels['resistance'][0]) / current_price < 0.005:
+            scores[BEAR] += MAX_SR_STRENGTH
+            notes.append(('📊 Price at major resistance: ${:.2f}', sr_levels['resistance'][0]))
         
-        if divergence['type'] != 'none':
-            signal['strength'] += divergence['strength'] // 2  # Weight it less
-            signal['reasons'].append(f"📈 {divergence['description']}")
-            if signal['bias'] == 'neutral':
-                signal['bias'] = divergence['type']
+        if scores.max() + max_orderflow < min_strength:
+            return self._reject(signal, scores)
         
         # STEP 5: ORDER FLOW ANALYSIS (Original Logic)
-        orderflow_signal = await self._analyze_orderflow()
-        signal['components']['orderflow'] = orderflow_signal
-        
-        signal['strength'] += orderflow_signal['strength']
-        signal['reasons'].extend(orderflow_signal['reasons'])
+        orderflow_signal = await self._analyze_orderflow(wall_levels)
+        signal.components['orderflow'] = orderflow_signal
         
-        if signal['bias'] == 'neutral' and orderflow_signal['bias'] != 'neutral':
-            signal['bias'] = orderflow_signal['bias']
+        if orderflow_signal['bias'] != 'neutral':
+            scores[DIRECTION_INDEX[orderflow_signal['bias']]] += orderflow_signal['strength']
+            notes.extend(orderflow_signal['reasons'])
         
         # STEP 6: FINAL DECISION
-        if signal['strength'] >= self.config.MIN_SIGNAL_STRENGTH:
+        best = int(np.argmax(scores))
+        signal.strength = int(scores[best])
+        signal.bias = BIAS_NAMES[best if signal.strength >= min_strength else 2]
+        
+        if signal.bias != 'neutral':
+            signal.reasons.extend(fmt.format(*args) for fmt, *args in notes)
+            
             # Check if bias aligns with market conditions
-            should_trade, reason = self.market_conditions.should_trade_in_current_conditions(signal['bias'])
+            should_trade, reason = self.market_conditions.should_trade_in_current_conditions(signal.bias)
             
             if should_trade:
-                if signal['bias'] == 'bullish':
-                    signal['action'] = 'buy'
-                elif signal['bias'] == 'bearish':
-                    signal['action'] = 'sell'
+                if signal.bias == 'bullish':
+                    signal.action = 'buy'
+                elif signal.bias == 'bearish':
+                    signal.action = 'sell'
                 
                 # Calculate entry, stop, and target
-                signal['entry_price'] = current_price
+                signal.entry_price = current_price
                 
-                if signal['action'] == 'buy':
-                    signal['stop_loss'] = current_price * (1 - self.config.STOP_LOSS_PERCENT / 100)
-                    signal['take_profit'] = current_price * (1 + self.config.TAKE_PROFIT_PERCENT / 100)
+                if signal.action == 'buy':
+                    signal.stop_loss = current_price * (1 - sl_frac)
+                    signal.take_profit = current_price * (1 + tp_frac)
                 else:
-                    signal['stop_loss'] = current_price * (1 + self.config.STOP_LOSS_PERCENT / 100)
-                    signal['take_profit'] = current_price * (1 - self.config.TAKE_PROFIT_PERCENT / 100)
+                    signal.stop_loss = current_price * (1 + sl_frac)
+                    signal.take_profit = current_price * (1 - tp_frac)
             else:
-                signal['reasons'].append(f"❌ {reason}")
+                signal.reasons.append(f"❌ {reason}")
         
-        self.last_signal = signal
-        return signal
+        return self._publish(signal)
+    
+    def _reject(self, signal: Signal, scores: np.ndarray) -> Signal:
+        """Finish a tick early once no remaining component can reach the threshold"""
+        signal.strength = int(scores.max())
+        return self._publish(signal)
+    
+    def _publish(self, signal: Signal) -> Signal:
+        """Hand out a private copy as last_signal: the scratch object is reset next tick"""
+        self.last_signal = replace(signal, reasons=list(signal.reasons), components=dict(signal.components))
+        return self.last_signal
     
     def _analyze_moving_averages(self) -> dict:
         """
@@ -136,25 +261,24 @@ class EnhancedOrderFlowStrategy:
         result = {
             'signal': 'none',
             'strength': 0,
-            'description': '',
+            'description_fmt': '',
+            'description_args': (),
             'emas': {}
         }
         
-        # Get 5-minute closes for analysis
-        closes = self.footprint.data_collector.get_closes('5m', 200)
+        cfg = self.config
+        fast_period = cfg.EMA_FAST
+        medium_period = cfg.EMA_MEDIUM
         
-        if len(closes) < 200:
+        # Wait until a full window of 5-minute closes has been seen
+        if not self._ema_ready:
             return result
         
-        # Calculate all EMAs
-        ema_fast = self.indicators.calculate_ema(closes[-self.config.EMA_FAST:], self.config.EMA_FAST)
-        ema_medium = self.indicators.calculate_ema(closes[-self.config.EMA_MEDIUM:], self.config.EMA_MEDIUM)
-        ema_slow = self.indicators.calculate_ema(closes[-self.config.EMA_SLOW:], self.config.EMA_SLOW)
-        ema_trend = self.indicators.calculate_ema(closes[-self.config.EMA_TREND:], self.config.EMA_TREND)
+        ema_fast, ema_medium, ema_slow, ema_trend = self._ema_state.tolist()
         
         # Previous EMAs for crossover detection
-        prev_fast = self.indicators.calculate_ema(closes[-(self.config.EMA_FAST+1):-1], self.config.EMA_FAST)
-        prev_medium = self.indicators.calculate_ema(closes[-(self.config.EMA_MEDIUM+1):-1], self.config.EMA_MEDIUM)
+        prev_fast = float(self._ema_prev[FAST])
+        prev_medium = float(self._ema_prev[MEDIUM])
         
         result['emas'] = {
             'fast': ema_fast,
@@ -163,7 +287,7 @@ class EnhancedOrderFlowStrategy:
             'trend': ema_trend
         }
         
-        current_price = closes[-1]
+        current_price = self._last_close
         
         # Check for crossovers
         crossover = self.indicators.detect_ema_crossover(ema_fast, ema_medium, prev_fast, prev_medium)
@@ -171,98 +295,115 @@ class EnhancedOrderFlowStrategy:
         if crossover == 'bullish':
             result['strength'] = 25
             result['signal'] = 'bullish'
-            result['description'] = f"🔄 Bullish EMA crossover: {self.config.EMA_FAST} crossed above {self.config.EMA_MEDIUM}"
+            result['description_fmt'] = "🔄 Bullish EMA crossover: {} crossed above {}"
+            result['description_args'] = (fast_period, medium_period)
             
             # Extra confirmation if above trend EMA
             if current_price > ema_trend:
                 result['strength'] += 10
-                result['description'] += " (above 200 EMA)"
+                result['description_fmt'] += " (above 200 EMA)"
         
         elif crossover == 'bearish':
             result['strength'] = 25
             result['signal'] = 'bearish'
-            result['description'] = f"🔄 Bearish EMA crossover: {self.config.EMA_FAST} crossed below {self.config.EMA_MEDIUM}"
+            result['description_fmt'] = "🔄 Bearish EMA crossover: {} crossed below {}"
+            result['description_args'] = (fast_period, medium_period)
             
             if current_price < ema_trend:
                 result['strength'] += 10
-                result['description'] += " (below 200 EMA)"
+                result['description_fmt'] += " (below 200 EMA)"
         
         # Check EMA alignment (all in order = strong trend)
         if ema_fast > ema_medium > ema_slow > ema_trend:
             result['strength'] += 15
             result['signal'] = 'bullish'
-            result['description'] = "📈 All EMAs aligned bullish"
+            result['description_fmt'] = "📈 All EMAs aligned bullish"
+            result['description_args'] = ()
         
         elif ema_fast < ema_medium < ema_slow < ema_trend:
             result['strength'] += 15
             result['signal'] = 'bearish'
-            result['description'] = "📉 All EMAs aligned bearish"
+            result['description_fmt'] = "📉 All EMAs aligned bearish"
+            result['description_args'] = ()
         
         return result
     
-    async def _analyze_orderflow(self) -> dict:
+    async def _analyze_orderflow(self, wall_levels: dict) -> dict:
         """
         Original order flow analysis (from first version)
+        
+        Reasons are returned as (format, *args) tuples so the caller only
+        renders them once a signal actually forms.
+        
+        Args:
+            wall_levels: output of data_collector.get_liquidity_walls()
         """
+        cfg = self.config
+        imb_hi = cfg.IMBALANCE_THRESHOLD
+        imb_lo = cfg.imbalance_lo
+        
         orderflow = {
             'bias': 'neutral',
             'strength': 0,
             'reasons': []
         }
         
-        # Get order book
-        orderbook = self.heat_map.data_collector.get_orderbook_snapshot()
-        
-        # Detect liquidity walls
-        walls = self.heat_map.detect_liquidity_walls(orderbook)
+        # Liquidity walls (masked scan straight over the SoA book)
+        walls = [
+            {'price': price, 'size': size, 'side': side}
+            for side, (prices, sizes) in (('bid', wall_levels['bids']), ('ask', wall_levels['asks']))
+            for price, size in zip(prices.tolist(), sizes.tolist())
+        ]
         self.heat_map.track_wall_lifecycle(walls)
         
         if walls:
-            orderflow['reasons'].append(f"🧱 Found {len(walls)} liquidity walls")
+            orderflow['reasons'].append(("🧱 Found {} liquidity walls", len(walls)))
+        
+        # Check absorption (FootprintAnalyzer works on the pandas footprint)
+        fp = self.footprint.data_collector.build_footprint(timeframe_seconds=60)
         
-        # Check absorption
-        footprint_df = self.footprint.build_footprint(timeframe_seconds=60)
+        if walls:
+            footprint_df = fp.to_frame()
         
         for wall in walls:
             absorption = self.footprint.detect_absorption(footprint_df, wall['price'], wall['side'])
             
             if absorption['detected']:
-                orderflow['strength'] += 30
-                orderflow['reasons'].append(f"💥 {absorption['message']}")
+                orderflow['strength'] += MAX_ABSORPTION_STRENGTH
+                orderflow['reasons'].append(("💥 {}", absorption['message']))
                 orderflow['bias'] = absorption['direction']
         
-        # Institutional activity
-        large_trades = self.institutional.detect_large_trades(threshold_btc=10.0)
-        if large_trades:
-            recent = [t for t in large_trades if (datetime.now() - t['timestamp']).seconds < 120]
+        # Institutional activity (prints of 10+ BTC in the last 2 minutes)
+        _, _, qty, is_buyer_maker = self.footprint.data_collector.get_recent(120)
+        large = qty >= 10.0
+        
+        if large.any():
+            buy_vol = qty[large & ~is_buyer_maker].sum()
+            sell_vol = qty[large & is_buyer_maker].sum()
             
-            if recent:
-                buy_vol = sum(t['quantity'] for t in recent if t['side'] == 'buy')
-                sell_vol = sum(t['quantity'] for t in recent if t['side'] == 'sell')
-                
-                if buy_vol > sell_vol * 2:
-                    orderflow['strength'] += 20
-                    orderflow['reasons'].append(f"🐋 Institutional buying: {buy_vol:.1f} BTC")
-                    orderflow['bias'] = 'bullish'
-                elif sell_vol > buy_vol * 2:
-                    orderflow['strength'] += 20
-                    orderflow['reasons'].append(f"🐋 Institutional selling: {sell_vol:.1f} BTC")
-                    orderflow['bias'] = 'bearish'
+            if buy_vol > sell_vol * 2:
+                orderflow['strength'] += 20
+                orderflow['reasons'].append(("🐋 Institutional buying: {:.1f} BTC", buy_vol))
+                orderflow['bias'] = 'bullish'
+            elif sell_vol > buy_vol * 2:
+                orderflow['strength'] += 20
+                orderflow['reasons'].append(("🐋 Institutional selling: {:.1f} BTC", sell_vol))
+                orderflow['bias'] = 'bearish'
         
         # Volume imbalance
-        if not footprint_df.empty:
-            total_buy = footprint_df['buy_volume'].sum()
-            total_sell = footprint_df['sell_volume'].sum()
+        if fp.buy_volume.size != 0:
+            total_buy = fp.buy_volume.sum()
+            total_sell = fp.sell_volume.sum()
             imbalance = total_buy / (total_buy + total_sell)
             
-            if imbalance > self.config.IMBALANCE_THRESHOLD:
+            if imbalance > imb_hi:
                 orderflow['strength'] += 20
-                orderflow['reasons'].append(f"⚖️ Strong buy imbalance: {imbalance:.1%}")
+                orderflow['reasons'].append(("⚖️ Strong buy imbalance: {:.1%}", imbalance))
                 if orderflow['bias'] == 'neutral':
                     orderflow['bias'] = 'bullish'
-            elif imbalance < (1 - self.config.IMBALANCE_THRESHOLD):
+            elif imbalance < imb_lo:
                 orderflow['strength'] += 20
-                orderflow['reasons'].append(f"⚖️ Strong sell imbalance: {(1-imbalance):.1%}")
+                orderflow['reasons'].append(("⚖️ Strong sell imbalance: {:.1%}", 1 - imbalance))
                 if orderflow['bias'] == 'neutral':
                     orderflow['bias'] = 'bearish'
         
@@ -1,6 +1,14 @@
+import asyncio
 import logging
+import logging.handlers
 import signal as sys_signal
 
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:  # uvloop is optional - fall back to the default asyncio loop
+    pass
+
 class ProductionOrderFlowBot:
     """
     Production-ready bot with all features integrated
@@ -37,13 +45,28 @@ class ProductionOrderFlowBot:
     
     def setup_logging(self):
         """Configure production logging"""
-g.basicConfig(
+        formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+        
+        file_handler = logging.handlers.RotatingFileHandler(
+            self.config.LOG_FILE,
+            maxBytes=self.config.LOG_MAX_BYTES,
+            backupCount=self.config.LOG_BACKUP_COUNT
+        )
+        stream_handler = logging.StreamHandler()
+        
+        # Buffer records and write them in batches. The file only flushes
+        # immediately on ERROR; the console already on WARNING.
+        self._log_buffers = []
+        for target, capacity, flush_level in ((file_handler, 256, logging.ERROR),
+                                              (stream_handler, 100, logging.WARNING)):
+            target.setFormatter(formatter)
+            self._log_buffers.append(logging.handlers.MemoryHandler(
+                capacity=capacity, flushLevel=flush_level, target=target
+            ))
+        
+        logging.basicConfig(
             level=getattr(logging, self.config.LOG_LEVEL),
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-            handlers=[
-                logging.FileHandler(self.config.LOG_FILE),
-                logging.StreamHandler()
-            ]
+            handlers=self._log_buffers
         )
         self.logger = logging.getLogger('ProductionBot')
     
@@ -120,11 +143,7 @@ g.basicConfig(
         
         # Start all data streams
         self.logger.info("Starting data streams...")
-        asyncio.create_task(self.data_collector.stream_orderbook())
-        asyncio.create_task(self.data_collector.stream_trades())
-        
-        for interval in self.config.KLINE_INTERVALS:
-            asyncio.create_task(self.data_collector.stream_klines(interval))
+        self.data_collector.start_streams()
         
         # Wait for initial data to populate
         self.logger.info("Waiting for initial data (30 seconds)...")
@@ -132,43 +151,66 @@ g.basicConfig(
         
         self.logger.info("🟢 Bot is now live and analyzing markets...")
         
-        analysis_counter = 0
+        # Check emergency stop
+        if self.config.EMERGENCY_STOP:
+            self.logger.warning("🚨 EMERGENCY STOP ACTIVATED")
+            return
+        
+        # Each cadence runs as its own task on a fixed schedule, so slow
+        # analysis never delays position monitoring and vice versa
+        tasks = [
+            asyncio.create_task(self._run_every(5, self._analysis_tick)),
+            asyncio.create_task(self._run_every(1, self.risk_manager.monitor_positions)),
+            asyncio.create_task(self._run_every(60, self.data_collector.update_account_info))
+        ]
+        
+        try:
+            # The fastest loop notices shutdown first - then stop the others
+            await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            for task in tasks:
+                task.cancel()
+    
+    async def _run_every(self, period: float, action):
+        """
+        Await `action` every `period` seconds until shutdown
+        
+        Deadlines are computed from loop.time(), so the cadence does not drift
+        with the action's own run time. Missed deadlines are skipped rather
+        than run back to back.
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
         
         while self.is_running:
             try:
-                # Check emergency stop
-                if self.config.EMERGENCY_STOP:
-                    self.logger.warning("🚨 EMERGENCY STOP ACTIVATED")
-                    break
-                
-                # Analyze market every 5 seconds
-                if analysis_counter % 5 == 0:
-                    signal = await self.strategy.analyze_market()
-                    
-                    # Log current state
-                    self.logger.info(
-                        f"Market: {signal['bias'].upper()} | "
-                        f"Strength: {signal['strength']}/100 | "
-                        f"Action: {signal['action'].upper()}"
-                    )
-                    
-                    # Execute if signal is strong enough
-                    if signal['action'] in ['buy', 'sell']:
-                        await self.order_executor.execute_signal(signal)
-                
-                # Monitor positions every second
-                await self.risk_manager.monitor_positions()
-                
-                # Update account info every 60 seconds
-                if analysis_counter % 60 == 0:
-                    await self.data_collector.update_account_info()
-                
-                analysis_counter += 1
-                await asyncio.sleep(1)
-                
+                await action()
             except Exception as e:
                 self.logger.error(f"Error in main loop: {e}", exc_info=True)
                 await asyncio.sleep(5)
+                deadline = loop.time()
+                continue
+            
+            now = loop.time()
+            deadline += period
+            if deadline < now:
+                deadline += ((now - deadline) // period + 1) * period
+            
+            await asyncio.sleep(deadline - now)
+    
+    async def _analysis_tick(self):
+        """Analyze the market and execute the signal if it calls for a trade"""
+        signal = await self.strategy.analyze_market()
+        
+        # Log current state (formatted by the logger only if INFO is enabled)
+        self.logger.info(
+            "Market: %s | Strength: %s/100 | Action: %s",
+            signal.bias.upper(), signal.strength, signal.action.upper()
+        )
+        
+        # Execute if signal is strong enough
+        if signal.action in ['buy', 'sell']:
+            await self.order_executor.execute_signal(signal)
     
     async def shutdown(self):
         """Graceful shutdown"""
@@ -180,10 +222,16 @@ g.basicConfig(
             self.logger.warning("⚠️ Emergency stop - consider closing positions manually")
         
         # Close connection
+        if self.data_collector:
+            self.data_collector.stop_streams()
+        
         if self.data_collector and self.data_collector.client:
             await self.data_collector.client.close_connection()
         
         self.logger.info("✅ Shutdown complete")
+        
+        for handler in self._log_buffers:
+            handler.flush()
         print("\n" + "="*80)
         print("Bot stopped. Stay safe and trade responsibly!")
         print("="*80 + "\n")
\ No newline at end of file
@@ -1,3 +1,45 @@
+import time
+
+VOLATILITY_WINDOW = 60  # 1m closes behind the volatility state
+
+def _make_trade_filter(require_trend_confirmation: bool):
+    """
+    Build the regime/volatility trade filter specialised for the config
+    
+    The trend-alignment check is only compiled in when trend confirmation
+    is required, so the disabled case carries no dead branches.
+    
+    Returns: function(regime, volatility, signal_bias) -> (should_trade, reason)
+    """
+    if require_trend_confirmation:
+        def trade_filter(regime: str, volatility: str, signal_bias: str) -> tuple[bool, str]:
+            # Don't trade in ranging markets with directional signals
+            if regime == 'ranging':
+                return False, "Market is ranging - avoid directional trades"
+            
+            # Check if bias aligns with trend
+            if signal_bias == 'bullish' and regime == 'trending_down':
+                return False, "Bullish signal against downtrend"
+            if signal_bias == 'bearish' and regime == 'trending_up':
+                return False, "Bearish signal against uptrend"
+            
+            # Extreme volatility warning
+            if volatility == 'extreme':
+                return False, "Volatility too high - risk of whipsaw"
+            
+            return True, "Market conditions favorable"
+    else:
+        def trade_filter(regime: str, volatility: str, signal_bias: str) -> tuple[bool, str]:
+            if regime == 'ranging':
+                return False, "Market is ranging - avoid directional trades"
+            
+            if volatility == 'extreme':
+                return False, "Volatility too high - risk of whipsaw"
+            
+            return True, "Market conditions favorable"
+    
+    return trade_filter
+
 class MarketConditionAnalyzer:
     """
     Detect market conditions:
@@ -16,7 +58,55 @@ class MarketConditionAnalyzer:
         self.current_regime = 'unknown'  # 'trending_up', 'trending_down', 'ranging'
         self.volatility_state = 'normal'  # 'low', 'normal', 'high', 'extreme'
         self.liquidity_state = 'good'  # 'good', 'poor'
+        self._vol24h_cache = (0.0, 0.0)  # (time.monotonic() of fetch, quote volume)
+        
+        # Config is frozen: bind thresholds once and specialise the trade filter
+        self._max_spread_bips = config.MAX_SPREAD_BIPS
+        self._min_volume_24h = config.MIN_VOLUME_24H_USDT
+        self._max_volatility = config.MAX_VOLATILITY_PERCENT
+        self._min_volatility = config.MIN_VOLATILITY_PERCENT
+        self._trend_threshold = config.TREND_THRESHOLD
+        self._ranging_threshold = config.RANGING_THRESHOLD
+        self._trade_filter = _make_trade_filter(config.REQUIRE_TREND_CONFIRMATION)
+        
+        # 15m EMAs for regime detection, recomputed once per closed candle
+        self._alpha_20 = 2 / (20 + 1)
+        self._alpha_50 = 2 / (50 + 1)
+        self._ema20_state = 0.0
+        self._ema50_state = 0.0
+        self._regime_samples = 0  # Closed 15m candles seen
+        
+        # Streaming 1m log-return stats over the volatility window (Welford mean / M2)
+        self._vol_samples = 0  # Closed 1m candles seen
+        self._vol_mean = 0.0
+        self._vol_m2 = 0.0
+        
+        # Verdicts only change when a new candle closes: (epoch, verdict)
+        self._regime_cache = (-1, 'unknown')
+        self._volatility_cache = (-1, 'normal')
+        
+        data_collector.kline_callbacks.append(self._on_kline)
+        
+    async def _on_kline(self, interval: str, candle: dict):
+        """Refresh the regime EMAs (15m) or advance the volatility window (1m) on a closed candle"""
+        if interval == '1m':
+            self._advance_volatility()
+            return
+        
+        if interval != '15m':
+            return
+        
+        self._regime_samples += 1
+        closes = self.data_collector.get_closes('15m', 50)
+        
+        if len(closes) < 50:
+            return
         
+        # Each EMA runs over its own trailing window seeded with the window's
+        # first close, the same semantics (and kernel) as calculate_ema
+        self._ema20_state = float(_ema_window(closes, 30, 50, self._alpha_20))
+        self._ema50_state = float(_ema_window(closes, 0, 50, self._alpha_50))
+    
     async def analyze_conditions(self) -> dict:
         """
         Complete market condition analysis
@@ -53,7 +143,7 @@ class MarketConditionAnalyzer:
         spread = self._calculate_spread()
         conditions['spread_bips'] = spread
         
-        if spread > self.config.MAX_SPREAD_BIPS:
+        if spread > self._max_spread_bips:
             conditions['is_tradeable'] = False
             conditions['warnings'].append(f"Spread too wide: {spread:.1f} bips")
         
@@ -61,7 +151,7 @@ class MarketConditionAnalyzer:
         volume_24h = await self._get_24h_volume()
         conditions['volume_24h'] = volume_24h
         
-        if volume_24h < self.config.MIN_VOLUME_24H_USDT:
+        if volume_24h < self._min_volume_24h:
             conditions['is_tradeable'] = False
             conditions['warnings'].append(f"Low 24h volume: ${volume_24h/1e9:.2f}B")
         
@@ -78,47 +168,98 @@ class MarketConditionAnalyzer:
         Detect if market is trending or ranging
         Uses EMA slopes and price action
         """
+        # The EMAs advance in _on_kline, so its sample count is the cache epoch
+        epoch = self._regime_samples
+        if epoch == self._regime_cache[0]:
+            return self._regime_cache[1]
+        
+        regime = self._classify_regime()
+        self._regime_cache = (epoch, regime)
+        return regime
+    
+    def _classify_regime(self) -> str:
+        """Classify the regime from the streaming 15m EMAs and price change"""
+        if self._regime_samples < 50:
+            return 'unknown'
+        
         # Get 15-minute closes
         closes = self.data_collector.get_closes('15m', 50)
         
         if len(closes) < 50:
             return 'unknown'
         
-        # Calculate EMAs
-        ema_20 = self.indicators.calculate_ema(closes[-20:], 20)
-        ema_50 = self.indicators.calculate_ema(closes[-50:], 50)
+        # EMAs are recomputed by _on_kline when a candle closes
+        ema_20 = self._ema20_state
+        ema_50 = self._ema50_state
         
         # Calculate price change over period
         price_change = (closes[-1] - closes[0]) / closes[0]
         
         # Trending conditions
-        if price_change > self.config.TREND_THRESHOLD and ema_20 > ema_50:
+        if price_change > self._trend_threshold and ema_20 > ema_50:
             return 'trending_up'
-        elif price_change < -self.config.TREND_THRESHOLD and ema_20 < ema_50:
+        elif price_change < -self._trend_threshold and ema_20 < ema_50:
             return 'trending_down'
         
         # Ranging conditions
-        if abs(price_change) < self.config.RANGING_THRESHOLD:
+        if abs(price_change) < self._ranging_threshold:
             return 'ranging'
         
         return 'transitioning'
     
+    def _advance_volatility(self):
+        """Slide the 1m log-return window forward by one closed candle in O(1)"""
+        self._vol_samples += 1
+        n = self._vol_samples
+        window = VOLATILITY_WINDOW
+        
+        if n < window:
+            return
+        
+        # Seed once the window fills, then re-seed every window to shed rounding drift
+        if n % window == 0:
+            returns = np.diff(np.log(self.data_collector.get_closes('1m', window)))
+            self._vol_mean = float(returns.mean())
+            self._vol_m2 = float(((returns - self._vol_mean) ** 2).sum())
+            return
+        
+        closes = self.data_collector.get_closes('1m', window + 1)
+        if len(closes) == 0:
+            return
+        
+        # Swap the oldest return for the newest (fixed-size Welford update)
+        r_new = float(np.log(closes[-1] / closes[-2]))
+        r_old = float(np.log(closes[1] / closes[0]))
+        delta = r_new - r_old
+        mean = self._vol_mean + delta / (window - 1)
+        self._vol_m2 += delta * ((r_new - mean) + (r_old - self._vol_mean))
+        self._vol_mean = mean
+    
     def _measure_volatility(self) -> str:
         """
-        Measure current volatility state
+        Measure current volatility state (recomputed once per closed 1m candle)
         """
-        closes = self.data_collector.get_closes('1m', 60)
+        # The window advances in _on_kline, so its sample count is the cache epoch
+        epoch = self._vol_samples
+        if epoch == self._volatility_cache[0]:
+            return self._volatility_cache[1]
         
-        if len(closes) < 60:
+        volatility = self._classify_volatility()
+        self._volatility_cache = (epoch, volatility)
+        return volatility
+    
+    def _classify_volatility(self) -> str:
+        if self._vol_samples < VOLATILITY_WINDOW:
             return 'normal'
         
-        volatility = self.indicators.calculate_volatility(closes, periods=60)
+        # Population std of the window's log returns, as a percentage
+        volatility = np.sqrt(max(self._vol_m2, 0.0) / (VOLATILITY_WINDOW - 1)) * 100
         
-        if volatility < self.config.MIN_VOLATILITY_PERCENT:
+        if volatility < self._min_volatility:
             return 'low'
-        elif volatility > self.config.MAX_VOLATILITY_PERCENT:
+        elif volatility > self._max_volatility:
             return 'extreme'
-        elif volatility > self.config.MAX_VOLATILITY_PERCENT * 0.7:
+        elif volatility > self._max_volatility * 0.7:
             return 'high'
         
         return 'normal'
@@ -127,25 +268,33 @@ class MarketConditionAnalyzer:
         """
         Calculate bid-ask spread in basis points
         """
-        orderbook = self.data_collector.orderbook
+        depth = self.data_collector.last_depth
         
-        if not orderbook['bids'] or not orderbook['asks']:
+        if depth is None or depth.best_bid == 0 or depth.best_ask == 0:
             return 1000  # Very high spread if no data
         
-        best_bid = max(orderbook['bids'].keys())
-        best_ask = min(orderbook['asks'].keys())
+        # Top of book is captured while each depth update is applied
+        best_bid = depth.best_bid
+        best_ask = depth.best_ask
         
         spread = (best_ask - best_bid) / best_bid * 10000  # Basis points
         
         return spread
     
     async def _get_24h_volume(self) -> float:
-        """Get 24-hour trading volume"""
+        """Get 24-hour trading volume (cached for VOLUME_24H_CACHE_SEC)"""
+        fetched_at, volume = self._vol24h_cache
+        if time.monotonic() - fetched_at < self.config.VOLUME_24H_CACHE_SEC:
+            return volume
+        
         try:
             ticker = await self.data_collector.client.futures_ticker(symbol=self.config.SYMBOL)
-            return float(ticker['quoteVolume'])
+            volume = float(ticker['quoteVolume'])
         except:
             return 0.0
+        
+        self._vol24h_cache = (time.monotonic(), volume)
+        return volume
     
     def should_trade_in_current_conditions(self, signal_bias: str) -> tuple[bool, str]:
         """
@@ -156,19 +305,4 @@ class MarketConditionAnalyzer:
         
         Returns: (should_trade, reason)
         """
-        # Don't trade in ranging markets with directional signals
-        if self.current_regime == 'ranging':
-            return False, "Market is ranging - avoid directional trades"
-        
-        # Check if bias aligns with trend
-        if self.config.REQUIRE_TREND_CONFIRMATION:
-            if signal_bias == 'bullish' and self.current_regime == 'trending_down':
-                return False, "Bullish signal against downtrend"
-            if signal_bias == 'bearish' and self.current_regime == 'trending_up':
-                return False, "Bearish signal against uptrend"
-        
-        # Extreme volatility warning
-        if self.volatility_state == 'extreme':
-            return False, "Volatility too high - risk of whipsaw"
-        
-        return True, "Market conditions favorable"
\ No newline at end of file
+        return self._trade_filter(self.current_regime, self.volatility_state, signal_bias)
\ No newline at end of file
@@ -1,3 +1,5 @@
+import asyncio
+import sys
 from binance.exceptions import BinanceAPIException
 
 class OrderExecutor:
@@ -17,8 +19,27 @@ class OrderExecutor:
         self.risk_manager = risk_manager
         
         self.orders = {}  # Track all orders
+        self._last_leverage = None  # Leverage last confirmed by the exchange
         
-    async def execute_signal(self, signal: dict):
+        # Trade summary template with every config constant already substituted
+        rule = '=' * 80
+        self._banner = f"{rule}\n\n"
+        self._trade_header = (
+            f"\n{rule}\n"
+            f"🎯 EXECUTING TRADE - {config.SYMBOL}\n"
+            f"{rule}\n"
+            "Direction: {side}\n"
+            "Entry Price: ${entry:.2f}\n"
+            "Position Size: {quantity:.6f} BTC (${notional:.2f})\n"
+            "Risk Amount: ${risk:.2f} ({risk_percent:.2f}%)\n"
+            f"Stop Loss: ${{stop:.2f}} ({config.STOP_LOSS_PERCENT}%)\n"
+            f"Take Profit: ${{target:.2f}} ({config.TAKE_PROFIT_PERCENT}%)\n"
+            f"Leverage: {config.LEVERAGE}x\n"
+            "Signal Strength: {strength}/100\n"
+            "\nReasons:\n"
+        )
+        
+    async def execute_signal(self, signal: Signal):
         """
         Execute trading signal with full risk management
         """
@@ -36,15 +57,19 @@ class OrderExecutor:
             print(reason)
             return
         
+        # One consistent view of the account for sizing and validation
+        account = self.data_collector.account
+        
         # Calculate position size
         position_size = self.position_sizer.calculate_position_size(
-            entry_price=signal['entry_price'],
-            stop_loss_price=signal['stop_loss'],
-            signal_strength=signal['strength']
+            entry_price=signal.entry_price,
+            stop_loss_price=signal.stop_loss,
+            signal_strength=signal.strength,
+            account=account
         )
         
         # Validate position size
-        is_valid, validation_msg = self.position_sizer.check_risk_limits(position_size)
+        is_valid, validation_msg = self.position_sizer.check_risk_limits(position_size, account)
         if not is_valid:
             print(f"❌ Position rejected: {validation_msg}")
             return
@@ -52,34 +77,40 @@ class OrderExecutor:
         # Execute the trade
         await self._place_market_order(signal, position_size)
     
-    async def _place_market_order(self, signal: dict, position_size: dict):
+    def _trade_summary(self, signal: Signal, side: str, position_size: dict) -> str:
+        """Render the trade summary from the precomputed template"""
+        header = self._trade_header.format(
+            side=side,
+            entry=signal.entry_price,
+            quantity=position_size['quantity_btc'],
+            notional=position_size['notional_usdt'],
+            risk=position_size['risk_usdt'],
+            risk_percent=position_size.get('risk_percent', 0),
+            stop=signal.stop_loss,
+            target=signal.take_profit,
+            strength=signal.strength
+        )
+        return header + "".join(f"  • {reason}\n" for reason in signal.reasons) + self._banner
+    
+    async def _place_market_order(self, signal: Signal, position_size: dict):
         """
         Place market order with stop loss and take profit
-        """
-        side = 'BUY' if signal['action'] == 'buy' else 'SELL'
         
-        print(f"\n{'='*80}")
-        print(f"🎯 EXECUTING TRADE - {self.config.SYMBOL}")
-        print(f"{'='*80}")
-        print(f"Direction: {side}")
-        print(f"Entry Price: ${signal['entry_price']:.2f}")
-        print(f"Position Size: {position_size['quantity_btc']:.6f} BTC (${position_size['notional_usdt']:.2f})")
-        print(f"Risk Amount: ${position_size['risk_usdt']:.2f} ({position_size.get('risk_percent', 0):.2f}%)")
-        print(f"Stop Loss: ${signal['stop_loss']:.2f} ({self.config.STOP_LOSS_PERCENT}%)")
-        print(f"Take Profit: ${signal['take_profit']:.2f} ({self.config.TAKE_PROFIT_PERCENT}%)")
-        print(f"Leverage: {self.config.LEVERAGE}x")
-        print(f"Signal Strength: {signal['strength']}/100")
-        print(f"\nReasons:")
-        for reason in signal['reasons']:
-            print(f"  • {reason}")
-        print(f"{'='*80}\n")
+        The fill is reported as soon as the entry returns, but only after the
+        SL/TP requests have started, so they are not delayed behind console I/O.
+        """
+        side = 'BUY' if signal.action == 'buy' else 'SELL'
+        order = None
+        legs = None  # SL/TP requests once the entry has filled
         
         try:
-            # Set leverage
-            await self.data_collector.client.futures_change_leverage(
-                symbol=self.config.SYMBOL,
-                leverage=self.config.LEVERAGE
-            )
+            # Set leverage (only when it differs from what was last set)
+            if self._last_leverage != self.config.LEVERAGE:
+                await self.data_collector.client.futures_change_leverage(
+                    symbol=self.config.SYMBOL,
+                    leverage=self.config.LEVERAGE
+                )
+                self._last_leverage = self.config.LEVERAGE
             
             # Place market order
             order = await self.data_collector.client.futures_create_order(
@@ -89,52 +120,97 @@ class OrderExecutor:
                 quantity=round(position_size['quantity_btc'], 6)
             )
             
-            print(f"✅ Market order filled: {order['orderId']}")
-            print(f"   Filled Qty: {order['executedQty']} BTC")
-            print(f"   Avg Price: ${float(order['avgPrice']):.2f}")
-            
-            # Place stop loss
+            # Place stop loss and take profit together - both only depend on the entry fill
             sl_side = 'SELL' if side == 'BUY' else 'BUY'
-            sl_order = await self.data_collector.client.futures_create_order(
-                symbol=self.config.SYMBOL,
-                side=sl_side,
-                type='STOP_MARKET',
-                stopPrice=round(signal['stop_loss'], 2),
-                quantity=round(position_size['quantity_btc'], 6),
-                reduceOnly=True
+            quantity = round(position_size['quantity_btc'], 6)
+            legs = asyncio.gather(
+                self._protective_order(sl_side, 'STOP_MARKET', signal.stop_loss, quantity),
+                self._protective_order(sl_side, 'TAKE_PROFIT_MARKET', signal.take_profit, quantity),
+                return_exceptions=True
             )
             
-            print(f"✅ Stop Loss placed: {sl_order['orderId']} @ ${signal['stop_loss']:.2f}")
+            # Let both leg requests start before any console I/O
+            await asyncio.sleep(0)
             
-            # Place take profit
-            tp_order = await self.data_collector.client.futures_create_order(
-                symbol=self.config.SYMBOL,
-                side=sl_side,
-                type='TAKE_PROFIT_MARKET',
-                stopPrice=round(signal['take_profit'], 2),
-                quantity=round(position_size['quantity_btc'], 6),
-                reduceOnly=True
+            sys.stdout.write(
+                self._trade_summary(signal, side, position_size) +
+                f"✅ Market order filled: {order['orderId']}\n"
+                f"   Filled Qty: {order['executedQty']} BTC\n"
+                f"   Avg Price: ${float(order['avgPrice']):.2f}\n"
             )
+            sys.stdout.flush()
             
-            print(f"✅ Take Profit placed: {tp_order['orderId']} @ ${signal['take_profit']:.2f}")
+            sl_order, tp_order = await legs
             
-            # Store order data
+            for name, leg, price in (('Stop Loss', sl_order, signal.stop_loss),
+                                     ('Take Profit', tp_order, signal.take_profit)):
+                if isinstance(leg, BaseException):
+                    print(f"❌ {name} NOT placed: {leg}")
+                else:
+                    print(f"✅ {name} placed: {leg['orderId']} @ ${price:.2f}")
+            
+            # Store order data (a leg that was not placed is recorded as None)
             self.orders[order['orderId']] = {
                 'entry_order': order,
-                'stop_loss': sl_order,
-                'take_profit': tp_order,
+                'stop_loss': None if isinstance(sl_order, BaseException) else sl_order,
+                'take_profit': None if isinstance(tp_order, BaseException) else tp_order,
                 'signal': signal,
                 'position_size': position_size,
                 'timestamp': datetime.now()
             }
             
             # Update account info
-            await self.data_collector.update_account_info()
+            await self.data_collector.update_account_info(force=True)
             
-            print(f"\n🎉 Trade executed successfully!\n")
+            missing = self._missing_legs(sl_order, tp_order)
+            if missing:
+                print(f"\n🚨 Entry order {order['orderId']} FILLED - position is OPEN WITHOUT {missing}\n")
+            else:
+                print(f"\n🎉 Trade executed successfully!\n")
             
         except BinanceAPIException as e:
+            await self._report_failure(signal, side, position_size, order, legs)
             print(f"❌ Binance API Error: {e.message}")
             print(f"   Error Code: {e.code}")
         except Exception as e:
-            print(f"❌ Execution error: {e}")
\ No newline at end of file
+            await self._report_failure(signal, side, position_size, order, legs)
+            print(f"❌ Execution error: {e}")
+    
+    def _protective_order(self, side: str, order_type: str, stop_price: float, quantity: float):
+        """Reduce-only stop order closing the position at `stop_price` (returns the request coroutine)"""
+        return self.data_collector.client.futures_create_order(
+            symbol=self.config.SYMBOL,
+            side=side,
+            type=order_type,
+            stopPrice=round(stop_price, 2),
+            quantity=quantity,
+            reduceOnly=True
+        )
+    
+    @staticmethod
+    def _missing_legs(sl_order, tp_order) -> str:
+        """Names of the protective legs that were not placed ('' when both were)"""
+        return ' / '.join(
+            name for name, leg in (('STOP LOSS', sl_order), ('TAKE PROFIT', tp_order))
+            if isinstance(leg, BaseException)
+        )
+    
+    async def _report_failure(self, signal: Signal, side: str, position_size: dict,
+                              order: dict, legs: asyncio.Future):
+        """
+        Print the trade summary (unless the fill already did) and flag an
+        unprotected position
+        
+        Legs still in flight are awaited first, so the alert names exactly the
+        protection that is missing.
+        """
+        if order is None:
+            sys.stdout.write(self._trade_summary(signal, side, position_size))
+            return
+        
+        missing = 'STOP LOSS / TAKE PROFIT'
+        if legs is not None:
+            missing = self._missing_legs(*await legs)  # gathered with return_exceptions
+        
+        if missing:
+            print(f"🚨 Entry order {order['orderId']} FILLED - position is OPEN WITHOUT {missing}")
\ No newline at end of file
@@ -1,3 +1,6 @@
+QTY_STEPS_PER_BTC = 1_000_000  # Exchange quantity step: 1e-6 BTC
+Q32 = 1 << 32  # Scale of the fixed-point risk fractions
+
 class PositionSizer:
     """
     Advanced position sizing strategies:
@@ -11,11 +14,40 @@ class PositionSizer:
         self.config = config
         self.data_collector = data_collector
         
+        # Resolve the sizing method once (unknown methods fall back to fixed percent)
+        self._sizer = {
+            'fixed_percent': self._fixed_percent_sizing,
+            'fixed_dollar': self._fixed_dollar_sizing,
+            'kelly': self._kelly_sizing
+        }.get(config.POSITION_SIZING_METHOD, self._fixed_percent_sizing)
+        
+        self._risk_frac = config.RISK_PER_TRADE_PERCENT / 100
+        self._max_risk_frac = config.MAX_ACCOUNT_RISK_PERCENT / 100
+        
+        # Fractional Kelly only depends on config: f* = (bp - q) / b, floored at 0
+        win_rate = config.KELLY_WIN_RATE
+        risk_reward = config.KELLY_RISK_REWARD
+        self._kelly_base = max(0.0, ((win_rate * risk_reward) - (1 - win_rate)) / risk_reward) * config.KELLY_FRACTION
+        
+        # Fixed-point equivalents: fractions in Q32, money in cents
+        self._tick_sizer = {
+            'fixed_percent': self._fixed_percent_ticks,
+            'fixed_dollar': self._fixed_dollar_ticks,
+            'kelly': self._kelly_ticks
+        }.get(config.POSITION_SIZING_METHOD, self._fixed_percent_ticks)
+        
+        self._risk_q32 = round(self._risk_frac * Q32)
+        self._kelly_q32 = round(self._kelly_base * Q32)
+        self._fixed_notional_cents = round(config.FIXED_POSITION_SIZE_USDT * 100)
+        
     def calculate_position_size(self, entry_price: float, stop_loss_price: float, 
-                               signal_strength: int = 50) -> dict:
+                               signal_strength: int = 50, account: AccountSnapshot = None) -> dict:
         """
         Calculate optimal position size based on configured method
         
+        Args:
+            account: snapshot to size against (defaults to the collector's current one)
+        
         Returns: {
             'quantity_btc': float,
             'notional_usdt': float,
@@ -23,34 +55,28 @@ class PositionSizer:
             'method': str
         }
         """
-        account_balance = self.data_collector.account_balance
+        if self.config.FIXED_POINT_SIZING:
+            return self.calculate_position_size_ticks(
+                round(entry_price * 100), round(stop_loss_price * 100), signal_strength, account
+            )
+        
+        account_balance = (account or self.data_collector.account).balance
         
         if account_balance <= 0:
             return {'quantity_btc': 0, 'notional_usdt': 0, 'risk_usdt': 0, 'method': 'no_balance'}
         
         # Calculate risk per unit
         risk_per_btc = abs(entry_price - stop_loss_price)
-        risk_percent = risk_per_btc / entry_price
         
-        if self.config.POSITION_SIZING_METHOD == 'fixed_percent':
-            return self._fixed_percent_sizing(account_balance, entry_price, risk_per_btc)
-        
-        elif self.config.POSITION_SIZING_METHOD == 'fixed_dollar':
-            return self._fixed_dollar_sizing(entry_price, risk_per_btc)
-        
-        elif self.config.POSITION_SIZING_METHOD == 'kelly':
-            return self._kelly_sizing(account_balance, entry_price, risk_per_btc, signal_strength)
-        
-        else:
-            # Default to fixed percent
-            return self._fixed_percent_sizing(account_balance, entry_price, risk_per_btc)
+        return self._sizer(account_balance, entry_price, risk_per_btc, signal_strength)
     
-    def _fixed_percent_sizing(self, balance: float, entry_price: float, risk_per_btc: float) -> dict:
+    def _fixed_percent_sizing(self, balance: float, entry_price: float,
+                              risk_per_btc: float, signal_strength: int) -> dict:
         """
         Risk X% of account balance per trade
         Example: $1000 balance, 1% risk = $10 risk
         """
-        risk_amount = balance * (self.config.RISK_PER_TRADE_PERCENT / 100)
+        risk_amount = balance * self._risk_frac
         quantity_btc = risk_amount / risk_per_btc
         notional_usdt = quantity_btc * entry_price
         
@@ -62,7 +88,8 @@ class PositionSizer:
             'risk_percent': self.config.RISK_PER_TRADE_PERCENT
         }
     
-    def _fixed_dollar_sizing(self, entry_price: float, risk_per_btc: float) -> dict:
+    def _fixed_dollar_sizing(self, balance: float, entry_price: float,
+                             risk_per_btc: float, signal_strength: int) -> dict:
         """
         Trade fixed dollar amount per position
         Example: Always trade $50 worth of BTC
@@ -89,19 +116,8 @@ class PositionSizer:
         
         Adjusted by signal strength
         """
-        # Kelly formula
-        win_rate = self.config.KELLY_WIN_RATE
-        risk_reward = self.config.KELLY_RISK_REWARD
-        
-        kelly_percent = ((win_rate * risk_reward) - (1 - win_rate)) / risk_reward
-        kelly_percent = max(0, kelly_percent)  # No negative sizing
-        
-        # Apply Kelly fraction for safety
-        kelly_percent *= self.config.KELLY_FRACTION
-        
-        # Adjust by signal strength (50-100% confidence)
-        confidence_factor = signal_strength / 100
-        kelly_percent *= confidence_factor
+        # Fractional Kelly (precomputed), adjusted by signal strength (50-100% confidence)
+        kelly_percent = self._kelly_base * (signal_strength * 0.01)
         
         # Calculate position
         risk_amount = balance * kelly_percent
@@ -116,27 +132,79 @@ class PositionSizer:
             'kelly_percent': kelly_percent * 100
         }
     
-    def check_risk_limits(self, position_size: dict) -> tuple[bool, str]:
+    def calculate_position_size_ticks(self, entry_cents: int, stop_loss_cents: int,
+                                      signal_strength: int = 50, account: AccountSnapshot = None) -> dict:
+        """
+        Integer fixed-point variant of calculate_position_size (for backtests)
+        
+        Prices are int cents, risk fractions are Q32 integers and quantities
+        are floored to the 1e-6 BTC step, so no float division is involved.
+        
+        Returns: same fields as calculate_position_size, plus 'quantity_steps'
+        """
+        balance_cents = round((account or self.data_collector.account).balance * 100)
+        
+        if balance_cents <= 0:
+            return {'quantity_btc': 0, 'notional_usdt': 0, 'risk_usdt': 0, 'method': 'no_balance'}
+        
+        risk_per_btc_cents = abs(entry_cents - stop_loss_cents)
+        risk_cents, quantity_steps, result = self._tick_sizer(
+            balance_cents, entry_cents, risk_per_btc_cents, signal_strength
+        )
+        
+        result['quantity_steps'] = quantity_steps
+        result['quantity_btc'] = quantity_steps / QTY_STEPS_PER_BTC
+        result['notional_usdt'] = quantity_steps * entry_cents / (QTY_STEPS_PER_BTC * 100)
+        result['risk_usdt'] = risk_cents / 100
+        return result
+    
+    def _fixed_percent_ticks(self, balance_cents: int, entry_cents: int,
+                             risk_per_btc_cents: int, signal_strength: int) -> tuple[int, int, dict]:
+        risk_cents = (balance_cents * self._risk_q32) >> 32
+        quantity_steps = risk_cents * QTY_STEPS_PER_BTC // risk_per_btc_cents
+        return risk_cents, quantity_steps, {
+            'method': 'fixed_percent', 'risk_percent': self.config.RISK_PER_TRADE_PERCENT
+        }
+    
+    def _fixed_dollar_ticks(self, balance_cents: int, entry_cents: int,
+                            risk_per_btc_cents: int, signal_strength: int) -> tuple[int, int, dict]:
+        quantity_steps = self._fixed_notional_cents * QTY_STEPS_PER_BTC // entry_cents
+        risk_cents = quantity_steps * risk_per_btc_cents // QTY_STEPS_PER_BTC
+        return risk_cents, quantity_steps, {'method': 'fixed_dollar'}
+    
+    def _kelly_ticks(self, balance_cents: int, entry_cents: int,
+                     risk_per_btc_cents: int, signal_strength: int) -> tuple[int, int, dict]:
+        risk_cents = (balance_cents * self._kelly_q32 * signal_strength // 100) >> 32
+        quantity_steps = risk_cents * QTY_STEPS_PER_BTC // risk_per_btc_cents
+        return risk_cents, quantity_steps, {
+            'method': 'kelly', 'kelly_percent': self._kelly_base * signal_strength
+        }
+    
+    def check_risk_limits(self, position_size: dict, account: AccountSnapshot = None) -> tuple[bool, str]:
         """
         Verify position doesn't exceed risk limits
         
+        Args:
+            account: snapshot to check against (defaults to the collector's current one)
+        
         Returns: (is_valid, reason)
         """
-        balance = self.data_collector.account_balance
+        account = account or self.data_collector.account
+        balance = account.balance
         
         # Check maximum account risk
-        max_risk = balance * (self.config.MAX_ACCOUNT_RISK_PERCENT / 100)
+        max_risk = balance * self._max_risk_frac
         if position_size['risk_usdt'] > max_risk:
             return False, f"Position risk ${position_size['risk_usdt']:.2f} exceeds max ${max_risk:.2f}"
         
         # Check daily loss limit
-        if self.data_collector.daily_pnl < 0:
-            daily_loss_percent = abs(self.data_collector.daily_pnl) / balance * 100
+        if account.daily_pnl < 0:
+            daily_loss_percent = abs(account.daily_pnl) / balance * 100
             if daily_loss_percent >= self.config.MAX_DAILY_LOSS_PERCENT:
                 return False, f"Daily loss limit reached: {daily_loss_percent:.1f}%"
         
         # Check maximum positions
-        if len(self.data_collector.open_positions) >= self.config.MAX_POSITIONS:
+        if account.open_positions_count >= self.config.MAX_POSITIONS:
             return False, f"Maximum positions reached: {self.config.MAX_POSITIONS}"
         
         return True, "Position size valid"
\ No newline at end of file
@@ -1,3 +1,36 @@
+import asyncio
+import calendar
+import logging
+import time
+from utils._njit import njit
+
+@njit(cache=True)
+def _trailing_stops_loop(position_amt, unrealized_pnl, current_price, old_stops, frac):
+    """
+    Trail the stop of every profitable position in one pass
+    
+    Longs trail `frac` below price and shorts `frac` above it. A stop only
+    ever moves in the position's favour; NaN means no stop yet.
+    
+    Returns: new stops (unchanged entries equal old_stops)
+    """
+    new_stops = old_stops.copy()
+    long_stop = current_price * (1.0 - frac)
+    short_stop = current_price * (1.0 + frac)
+    
+    for i in range(len(position_amt)):
+        if unrealized_pnl[i] <= 0:
+            continue
+        
+        if position_amt[i] > 0:
+            if np.isnan(old_stops[i]) or long_stop > old_stops[i]:
+                new_stops[i] = long_stop
+        else:
+            if np.isnan(old_stops[i]) or short_stop < old_stops[i]:
+                new_stops[i] = short_stop
+    
+    return new_stops
+
 class RiskManager:
     """
     Comprehensive risk management:
@@ -12,8 +45,61 @@ class RiskManager:
         self.data_collector = data_collector
         
         self.active_stops = {}  # position_id -> stop_data
-        self.daily_reset_time = datetime.now().replace(hour=0, minute=0, second=0)
+        self.logger = logging.getLogger('RiskManager')
+        self._next_reset_epoch = self._next_midnight_utc()  # Unix seconds
+        
+        # Trailing stops are event driven: a trade that crosses a position's
+        # next trigger price enqueues (monotonic_ns, position_id), and
+        # monitor_positions only recomputes stops when the queue is non-empty
+        self.trail_events = asyncio.PriorityQueue()
+        self._trail_pending = set()  # position_ids already queued
+        self._trail_positions = None  # positions_soa the triggers belong to
+        self._trail_triggers = np.empty(0, dtype=np.float64)
+        
+        if config.TRAILING_STOP_ENABLED:
+            data_collector.trade_callbacks.append(self._on_trades)
         
+    async def _on_trades(self, data_collector, n_trades: int):
+        """Queue a trailing update for every position whose trigger price was crossed"""
+        positions = data_collector.positions_soa
+        
+        if positions is not self._trail_positions:
+            self._compute_trail_triggers(positions)
+        
+        if len(self._trail_triggers) == 0:
+            return
+        
+        price = data_collector.current_price
+        is_long = positions['position_amt'] > 0
+        crossed = np.where(is_long, price > self._trail_triggers, price < self._trail_triggers)
+        
+        for i in np.flatnonzero(crossed):
+            position_id = positions['position_id'][i]
+            
+            if position_id not in self._trail_pending:
+                self._trail_pending.add(position_id)
+                self.trail_events.put_nowait((time.monotonic_ns(), position_id))
+    
+    def _compute_trail_triggers(self, positions: dict):
+        """
+        Price beyond which each position's trailing stop would move
+        
+        Longs trigger above stop / (1 - frac), shorts below stop / (1 + frac).
+        Positions without a stop trigger on any price; losing positions never
+        trigger until the next account refresh.
+        """
+        frac = self.config.trailing_stop_frac
+        is_long = positions['position_amt'] > 0
+        stops = np.array([self.active_stops.get(pid, np.nan) for pid in positions['position_id']])
+        
+        always = np.where(is_long, -np.inf, np.inf)
+        triggers = np.where(is_long, stops / (1 - frac), stops / (1 + frac))
+        triggers = np.where(np.isnan(stops), always, triggers)
+        triggers = np.where(positions['unrealized_pnl'] > 0, triggers, -always)
+        
+        self._trail_positions = positions
+        self._trail_triggers = triggers
+    
     async def monitor_positions(self):
         """
         Continuously monitor open positions for:
@@ -21,62 +107,79 @@ class RiskManager:
         - Take profit hits
         - Trailing stop updates
         """
-        for position in self.data_collector.open_positions:
-            position_side = 'LONG' if float(position['positionAmt']) > 0 else 'SHORT'
-            entry_price = float(position['entryPrice'])
-            current_price = self.data_collector.current_price
-            unrealized_pnl = float(position['unRealizedProfit'])
-            
-            # Check for trailing stop update
-            if self.config.TRAILING_STOP_ENABLED:
-                await self._update_trailing_stop(position, current_price, unrealized_pnl)
-            
-            # Log position status
-            pnl_percent = (unrealized_pnl / (entry_price * abs(float(position['positionAmt'])))) * 100
-            
-            if abs(pnl_percent) > 1:  # Log if significant movement
-                print(f"📍 Position: {position_side} | Entry: ${entry_price:.2f} | "
-                      f"Current: ${current_price:.2f} | PnL: {pnl_percent:+.2f}%")
+        # Positions are preparsed into arrays once per account refresh
+        positions = self.data_collector.positions_soa
+        position_amt = positions['position_amt']
+        
+        if len(position_amt) == 0:
+            return
+        
+        entry_price = positions['entry_price']
+        unrealized_pnl = positions['unrealized_pnl']
+        current_price = self.data_collector.current_price
+        
+        # Check for trailing stop update (only when a trigger price was crossed)
+        if self.config.TRAILING_STOP_ENABLED and not self.trail_events.empty():
+            await self._update_trailing_stops(positions, current_price)
+        
+        # Log position status
+        pnl_percent = unrealized_pnl / (entry_price * np.abs(position_amt)) * 100
+        
+        for i in np.flatnonzero(np.abs(pnl_percent) > 1):  # Log if significant movement
+            position_side = 'LONG' if position_amt[i] > 0 else 'SHORT'
+            print(f"📍 Position: {position_side} | Entry: ${entry_price[i]:.2f} | "
+                  f"Current: ${current_price:.2f} | PnL: {pnl_percent[i]:+.2f}%")
     
-    async def _update_trailing_stop(self, position, current_price: float, unrealized_pnl: float):
-        """Update trailing stop if position is profitable"""
-        position_id = position['symbol'] + '_' + position['positionSide']
-        entry_price = float(position['entryPrice'])
-        position_amt = float(position['positionAmt'])
+    async def _update_trailing_stops(self, positions: dict, current_price: float):
+        """Update trailing stops of all profitable positions in one pass"""
+        # Consume the pending events - one pass covers every position
+        while not self.trail_events.empty():
+            self.trail_events.get_nowait()
+        self._trail_pending.clear()
         
-        is_long = position_amt > 0
+        position_ids = positions['position_id']
+        position_amt = positions['position_amt']
+        old_stops = np.array([self.active_stops.get(pid, np.nan) for pid in position_ids])
         
-        # Only trail if in profit
-        if unrealized_pnl <= 0:
-            return
+        new_stops = _trailing_stops_loop(
+            position_amt, positions['unrealized_pnl'], float(current_price),
+            old_stops, self.config.trailing_stop_frac
+        )
         
-        # Calculate new trailing stop
-        if is_long:
-            new_stop = current_price * (1 - self.config.TRAILING_STOP_PERCENT / 100)
-            
-            # Update if better than current stop
-            if position_id not in self.active_stops or new_stop > self.active_stops[position_id]:
-                self.active_stops[position_id] = new_stop
-                print(f"🔄 Trailing stop updated (LONG): ${new_stop:.2f}")
-        else:
-            new_stop = current_price * (1 + self.config.TRAILING_STOP_PERCENT / 100)
+        # Only the stops that actually moved are written back
+        moved = ~np.isnan(new_stops) & (new_stops != old_stops)
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        
+        for i in np.flatnonzero(moved):
+            self.active_stops[position_ids[i]] = float(new_stops[i])
             
-            if position_id not in self.active_stops or new_stop < self.active_stops[position_id]:
-                self.active_stops[position_id] = new_stop
-                print(f"🔄 Trailing stop updated (SHORT): ${new_stop:.2f}")
+            if debug:
+                self.logger.debug("🔄 Trailing stop updated (%s): $%.2f",
+                                  'LONG' if position_amt[i] > 0 else 'SHORT', new_stops[i])
+        
+        self._compute_trail_triggers(positions)
+    
+    @staticmethod
+    def _next_midnight_utc() -> int:
+        """Unix time of the next UTC midnight"""
+        today = time.gmtime()
+        return calendar.timegm((today.tm_year, today.tm_mon, today.tm_mday, 0, 0, 0)) + 86400
     
     def check_daily_limits(self) -> tuple[bool, str]:
         """Check if daily loss limit has been hit"""
-        # Reset daily PnL at midnight
-        if datetime.now() > self.daily_reset_time + timedelta(days=1):
+        # Reset daily PnL at midnight (UTC)
+        if time.time() >= self._next_reset_epoch:
             self.data_collector.daily_pnl = 0
             self.data_collector.daily_trades = 0
-            self.daily_reset_time = datetime.now().replace(hour=0, minute=0, second=0)
+            self.data_collector.publish_account()
+            self._next_reset_epoch = self._next_midnight_utc()
             print("🔄 Daily limits reset")
         
+        account = self.data_collector.account
+        
         # Check daily loss
-        if self.data_collector.daily_pnl < 0:
-            loss_percent = abs(self.data_collector.daily_pnl) / self.data_collector.account_balance * 100
+        if account.daily_pnl < 0:
+            loss_percent = abs(account.daily_pnl) / account.balance * 100
             
             if loss_percent >= self.config.MAX_DAILY_LOSS_PERCENT:
                 return False, f"❌ Daily loss limit hit: {loss_percent:.2f}%"
@@ -1,3 +1,114 @@
+from utils._njit import HAVE_NUMBA, njit
+
+try:
+    from scipy.signal import lfilter
+except ImportError:  # scipy is optional - fall back to the Python recurrence
+    lfilter = None
+
+@njit(cache=True)
+def _ema_step(ema, comp, price, alpha):
+    """
+    One EMA update, ema += alpha * (price - ema), with Neumaier compensation
+    
+    `comp` carries the rounding lost from `ema`, so errors do not build up
+    over long series. Kernels using this must not enable fastmath:
+    reassociation would optimise the compensation away.
+    
+    Returns: (ema, comp) - the EMA value is ema + comp
+    """
+    step = alpha * (price - (ema + comp))
+    total = ema + step
+    
+    if abs(ema) >= abs(step):
+        comp += (ema - total) + step
+    else:
+        comp += (step - total) + ema
+    
+    return total, comp
+
+@njit(cache=True)
+def _ema_window(prices, start, end, alpha):
+    """EMA of prices[start:end] seeded with its first price"""
+    ema = prices[start]
+    comp = 0.0
+    
+    for i in range(start + 1, end):
+        ema, comp = _ema_step(ema, comp, prices[i], alpha)
+    
+    return ema + comp
+
+@njit(cache=True)
+def _ema_loop(prices, period):
+    """EMA recurrence seeded with the first price"""
+    return _ema_window(prices, 0, len(prices), 2.0 / (period + 1))
+
+def _make_ema_series_kernel(period: int):
+    """
+    Build an EMA series kernel with the smoothing factor for `period` baked in
+    
+    The returned function writes the EMA of every price (seeded with the
+    first) into `out`, which must have the same length as prices.
+    """
+    alpha = 2.0 / (period + 1)
+    
+    @njit
+    def ema_series(prices, out):
+        ema = prices[0]
+        comp = 0.0
+        out[0] = ema
+        
+        for i in range(1, len(prices)):
+            ema, comp = _ema_step(ema, comp, prices[i], alpha)
+            out[i] = ema + comp
+        
+        return out
+    
+    return ema_series
+
+_ema_series_kernels = {}  # period -> specialised kernel, compiled on first use
+
+@njit(cache=True)
+def _ema_multi_nb(prices, alphas):
+    """EMAs for several smoothing factors in one pass over prices: out[i, j]"""
+    k = len(alphas)
+    out = np.empty((len(prices), k))
+    ema = np.full(k, prices[0])
+    comp = np.zeros(k)
+    out[0, :] = prices[0]
+    
+    for i in range(1, len(prices)):
+        price = prices[i]
+        
+        for j in range(k):
+            ema[j], comp[j] = _ema_step(ema[j], comp[j], price, alphas[j])
+            out[i, j] = ema[j] + comp[j]
+    
+    return out
+
+@njit(cache=True)
+def _vol_loop(prices, period):
+    """
+    Population standard deviation of log returns over the last `period` prices
+    
+    Single pass with Welford's update, which stays accurate when returns are
+    tiny relative to their mean square (tight-range markets).
+    """
+    start = len(prices) - period
+    n = 0
+    mean = 0.0
+    m2 = 0.0
+    
+    for i in range(start + 1, len(prices)):
+        r = np.log(prices[i] / prices[i - 1])
+        n += 1
+        delta = r - mean
+        mean += delta / n
+        m2 += delta * (r - mean)
+    
+    return np.sqrt(m2 / n)
+
+_CROSSOVER_LABELS = ('none', 'bullish', 'bearish')
+
 class TechnicalIndicators:
     """
     Calculate technical indicators:
@@ -12,28 +123,59 @@ class TechnicalIndicators:
         if len(prices) < period:
             return 0.0
         
-        multiplier = 2 / (period + 1)
-        ema = prices[0]
-        
-        for price in prices[1:]:
-            ema = (price * multiplier) + (ema * (1 - multiplier))
-        
-        return ema
+        return float(_ema_loop(np.ascontiguousarray(prices, dtype=np.float64), period))
     
     @staticmethod
-    def calculate_ema_series(prices: np.array, period: int) -> np.array:
-        """Calculate EMA for entire series"""
+    def calculate_ema_series(prices: np.array, period: int, out: np.ndarray = None) -> np.array:
+        """
+        Calculate EMA for entire series
+        
+        Pass a C-contiguous float64 `out` of the same length as prices to have
+        it filled in place instead of allocating a new array on every call.
+        """
         if len(prices) < period:
             return np.array([])
         
-        emas = np.zeros(len(prices))
-        emas[0] = prices[0]
         multiplier = 2 / (period + 1)
+        one_minus = 1 - multiplier
+        prices = np.ascontiguousarray(prices, dtype=np.float64)
         
-        for i in range(1, len(prices)):
-            emas[i] = (prices[i] * multiplier) + (emas[i-1] * (1 - multiplier))
+        if out is None:
+            out = np.empty(len(prices))  # every slot is written, no zero fill
+        elif out.shape != prices.shape:
+            raise ValueError(f"out has shape {out.shape}, expected {prices.shape}")
+        elif out.dtype != np.float64 or not out.flags.c_contiguous:
+            raise ValueError(f"out must be a C-contiguous float64 array, got {out.dtype}")
         
-        return emas
+        # Compiled loop first, then scipy's C filter, then the kernel as plain Python
+        if HAVE_NUMBA or lfilter is None:
+            kernel = _ema_series_kernels.get(period)
+            
+            if kernel is None:
+                kernel = _ema_series_kernels[period] = _make_ema_series_kernel(period)
+            
+            return kernel(prices, out)
+        
+        # First-order IIR y[i] = m*x[i] + (1-m)*y[i-1], seeded so y[0] = x[0]
+        out[:], _ = lfilter([multiplier], [1.0, -one_minus], prices,
+                            zi=[prices[0] * one_minus])
+        return out
+    
+    @staticmethod
+    def calculate_emas_multi(prices: np.array, periods) -> np.array:
+        """
+        Calculate EMA series for several periods in a single pass over prices
+        
+        Returns: array of shape (len(prices), len(periods)), column j is the
+        EMA for periods[j] (empty if prices is shorter than the longest period)
+        """
+        periods = np.asarray(periods, dtype=np.float64)
+        
+        if len(periods) == 0 or len(prices) < periods.max():
+            return np.empty((0, len(periods)))
+        
+        alphas = 2.0 / (periods + 1.0)
+        return _ema_multi_nb(np.ascontiguousarray(prices, dtype=np.float64), alphas)
     
     @staticmethod
     def detect_ema_crossover(fast_ema: float, slow_ema: float, 
@@ -42,24 +184,23 @@ class TechnicalIndicators:
         Detect EMA crossovers
         Returns: 'bullish', 'bearish', or 'none'
         """
-        # Bullish crossover: fast crosses above slow
-        if prev_fast <= prev_slow and fast_ema > slow_ema:
-            return 'bullish'
+        prev = prev_fast - prev_slow
+        cur = fast_ema - slow_ema
         
-        # Bearish crossover: fast crosses below slow
-        if prev_fast >= prev_slow and fast_ema < slow_ema:
-            return 'bearish'
-        
-        return 'none'
+        # Bullish: fast crosses above slow (1); bearish: fast crosses below slow (2)
+        idx = (cur > 0) * (prev <= 0) + 2 * ((cur < 0) * (prev >= 0))
+        return _CROSSOVER_LABELS[idx]
     
     @staticmethod
     def calculate_volatility(prices: np.array, periods: int = 14) -> float:
-        """Calculate price volatility (standard deviation)"""
+        """Calculate price volatility (standard deviation of log returns)"""
         if len(prices) < periods:
             return 0.0
         
-        returns = np.diff(prices[-periods:]) / prices[-periods:-1]
-        return np.std(returns) * 100  # As percentage
+        if periods < 2:
+            return float('nan')  # No return inside the window
+        
+        return float(_vol_loop(np.ascontiguousarray(prices, dtype=np.float64), periods)) * 100  # As percentage
     
     @staticmethod
     def calculate_atr(highs: np.array, lows: np.array, closes: np.array, period: int = 14) -> float:
@@ -67,13 +208,10 @@ class TechnicalIndicators:
         if len(highs) < period or len(lows) < period or len(closes) < period:
             return 0.0
         
-        tr_list = []
-        for i in range(1, len(closes)):
-            tr = max(
-                highs[i] - lows[i],
-                abs(highs[i] - closes[i-1]),
-                abs(lows[i] - closes[i-1])
-            )
-            tr_list.append(tr)
+        # True range of every bar after the first, in one vectorized pass
+        prev_close = closes[:-1]
+        high = highs[1:]
+        low = lows[1:]
+        tr = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
         
-        return np.mean(tr_list[-period:])
\ No newline at end of file
+        return tr[-period:].mean()
\ No newline at end of file
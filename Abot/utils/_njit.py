@@ -0,0 +1,17 @@
+"""
+Optional numba support
+
+Kernels are decorated with `njit` from here. Without numba installed the
+decorator is a no-op and the kernels run as plain Python.
+"""
+
+try:
+    from numba import njit
+    HAVE_NUMBA = True
+except ImportError:  # numba is optional - run the kernels as plain Python
+    HAVE_NUMBA = False
+    
+    def njit(*args, **kwargs):
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda func: func
@@ -1,3 +1,35 @@
+from utils._njit import njit
+
+@njit(cache=True)
+def _value_area_bounds(volumes, poc_index, target_volume):
+    """
+    Grow the value area outward from the POC bin, one neighbour at a time
+    
+    Each step takes the heavier of the two adjacent bins (ties go up) until
+    the covered volume reaches `target_volume` or both ends are exhausted.
+    
+    Returns: (low_index, high_index) into `volumes`, inclusive
+    """
+    last = len(volumes) - 1
+    va_volume = float(volumes[poc_index])  # accumulate in float64 even for float32 bins
+    low_index = poc_index
+    high_index = poc_index
+    
+    while va_volume < target_volume:
+        low_vol = volumes[low_index - 1] if low_index > 0 else 0.0
+        high_vol = volumes[high_index + 1] if high_index < last else 0.0
+        
+        if low_vol > high_vol and low_index > 0:
+            low_index -= 1
+            va_volume += low_vol
+        elif high_index < last:
+            high_index += 1
+            va_volume += high_vol
+        else:
+            break
+    
+    return low_index, high_index
+
 class VolumeProfile:
     """
     Volume Profile Analysis:
@@ -10,97 +42,99 @@ class VolumeProfile:
         self.config = config
         self.data_collector = data_collector
         
-        # Volume profile data
-        self.profile = {}  # price -> volume
+        # Volume profile data: occupied bins, ascending by price
+        self.profile_prices = np.empty(0)  # bin floor price
+        self.profile_volumes = np.empty(0, dtype=np.float32)  # traded quantity per bin
+        self.poc_index = 0
         self.poc = 0.0  # Point of Control
         self.value_area_high = 0.0
         self.value_area_low = 0.0
         
+        # Last build, reused until a new 1m candle closes
+        self._cache_key = None
+        self._cache = {}
+        
     def build_profile(self, lookback_hours: int = 24) -> dict:
         """
         Build volume profile from recent trades
-        """
-        cutoff_time = datetime.now() - timedelta(hours=lookback_hours)
         
-        # Filter recent trades
-        recent_trades = [
-            t for t in self.data_collector.trades
-            if t['timestamp'] > cutoff_time
-        ]
+        The result is cached per (lookback_hours, last closed 1m candle), so
+        analysis ticks within the same minute reuse it.
+        """
+        timestamps = ()
+        if '1m' in self.data_collector.kline_index:
+            timestamps, _ = self.data_collector.get_klines('1m')
+        
+        if len(timestamps):
+            cache_key = (lookback_hours, int(timestamps[-1]))
+            if cache_key == self._cache_key:
+                return self._cache
+        else:
+            cache_key = None
+        
+        self._cache_key = cache_key
+        self._cache = self._build_profile(lookback_hours)
+        return self._cache
+    
+    def _build_profile(self, lookback_hours: int) -> dict:
+        """Aggregate trade volume into price bins and derive POC / Value Area"""
+        _, prices, quantities, _ = self.data_collector.get_recent(lookback_hours * 3600)
         
-        if not recent_trades:
+        if len(prices) == 0:
             return {}
         
         # Get price range
-        prices = [t['price'] for t in recent_trades]
-        min_price = min(prices)
-        max_price = max(prices)
+        min_price = prices.min()
+        max_price = prices.max()
         
         # Create price bins
-        bin_size = (max_price - min_price) / self.config.VP_PRICE_BINS
+        n_bins = self.config.VP_PRICE_BINS
+        bin_size = (max_price - min_price) / n_bins
+        
+        # Assign every trade to a bin (the max price closes the top bin)
+        if bin_size > 0:
+            bin_index = np.minimum(((prices - min_price) / bin_size).astype(np.int64), n_bins - 1)
+        else:
+            bin_index = np.zeros(len(prices), dtype=np.int64)
         
-        # Aggregate volume by price bin
-        volume_by_price = {}
+        # Aggregate volume by price bin, keeping only bins that traded
+        volume_by_bin = np.bincount(bin_index, weights=quantities, minlength=n_bins)
+        occupied = np.flatnonzero(volume_by_bin)
         
-        for trade in recent_trades:
-            # Assign to bin
-            bin_index = int((trade['price'] - min_price) / bin_size)
-            bin_price = min_price + (bin_index * bin_size)
-            
-            if bin_price not in volume_by_price:
-                volume_by_price[bin_price] = 0
-            
-            volume_by_price[bin_price] += trade['quantity']
+        self.profile_prices = min_price + occupied * bin_size
+        self.profile_volumes = volume_by_bin[occupied].astype(np.float32)
         
-        self.profile = volume_by_price
+        if len(occupied) == 0:
+            return {}
         
         # Calculate POC (Point of Control)
-        if volume_by_price:
-            self.poc = max(volume_by_price, key=volume_by_price.get)
+        self.poc_index = int(self.profile_volumes.argmax())
+        self.poc = float(self.profile_prices[self.poc_index])
         
         # Calculate Value Area (70% of volume)
         self._calculate_value_area()
         
         return {
-            'profile': self.profile,
+            'profile': (self.profile_prices, self.profile_volumes),
             'poc': self.poc,
             'value_area_high': self.value_area_high,
             'value_area_low': self.value_area_low,
-            'total_volume': sum(volume_by_price.values())
+            'total_volume': float(self.profile_volumes.sum(dtype=np.float64))
         }
     
     def _calculate_value_area(self):
         """Calculate Value Area (70% volume concentration)"""
-        if not self.profile:
+        if len(self.profile_volumes) == 0:
             return
         
-        total_volume = sum(self.profile.values())
-        target_volume = total_volume * (self.config.VP_VALUE_AREA_PERCENT / 100)
+        volumes = self.profile_volumes
+        target_volume = volumes.sum(dtype=np.float64) * (self.config.VP_VALUE_AREA_PERCENT / 100)
         
         # Start from POC and expand outward
-        sorted_prices = sorted(self.profile.keys())
-        poc_index = sorted_prices.index(self.poc)
-        
-        va_volume = self.profile[self.poc]
-        low_index = poc_index
-        high_index = poc_index
-        
-        while va_volume < target_volume:
-            # Check which direction has more volume
-            low_vol = self.profile[sorted_prices[low_index - 1]] if low_index > 0 else 0
-            high_vol = self.profile[sorted_prices[high_index + 1]] if high_index < len(sorted_prices) - 1 else 0
-            
-            if low_vol > high_vol and low_index > 0:
-                low_index -= 1
-                va_volume += low_vol
-            elif high_index < len(sorted_prices) - 1:
-                high_index += 1
-                va_volume += high_vol
-            else:
-                break
-        
-        self.value_area_low = sorted_prices[low_index]
-        self.value_area_high = sorted_prices[high_index]
+        low_index, high_index = _value_area_bounds(volumes, self.poc_index, target_volume)
+        
+        self.value_area_low = float(self.profile_prices[low_index])
+        self.value_area_high = float(self.profile_prices[high_index])
     
     def is_price_in_value_area(self, price: float) -> bool:
         """Check if price is within value area"""
@@ -108,24 +142,32 @@ class VolumeProfile:
     
     def get_support_resistance(self) -> dict:
         """Identify high volume nodes as support/resistance"""
-        if not self.profile:
-            return {'support': [], 'resistance': []}
+        if len(self.profile_volumes) == 0:
+            return {'support': np.array([]), 'resistance': np.array([])}
         
         current_price = self.data_collector.current_price
         
-        # Find high volume nodes
-        avg_volume = sum(self.profile.values()) / len(self.profile)
-        threshold = avg_volume * 1.5  # 1.5x average = significant node
+        prices = self.profile_prices
+        volumes = self.profile_volumes
         
-        significant_nodes = [
-            price for price, volume in self.profile.items()
-            if volume >= threshold
-        ]
+        # Find high volume nodes
+        threshold = volumes.mean() * 1.5  # 1.5x average = significant node
+        significant_nodes = prices[volumes >= threshold]
         
-        support = [p for p in significant_nodes if p < current_price]
-        resistance = [p for p in significant_nodes if p > current_price]
+        support = significant_nodes[significant_nodes < current_price]
+        resistance = significant_nodes[significant_nodes > current_price]
         
         return {
-            'support': sorted(support, reverse=True)[:3],  # Top 3 closest
-            'resistance': sorted(resistance)[:3]
-        }
\ No newline at end of file
+            'support': self._nearest(support, 3, below=True),  # Top 3 closest
+            'resistance': self._nearest(resistance, 3, below=False)
+        }
+    
+    @staticmethod
+    def _nearest(levels: np.ndarray, k: int, below: bool) -> np.ndarray:
+        """Pick the k levels closest to price without fully sorting (closest first)"""
+        if len(levels) > k:
+            key = -levels if below else levels
+            levels = levels[np.argpartition(key, k - 1)[:k]]
+        
+        levels = np.sort(levels)
+        return levels[::-1] if below else levels
\ No newline at end of file